@@ -1,16 +1,39 @@
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class BlogGenerator:
-    def __init__(self):
+    def __init__(self, max_workers=None, timeout=None):
         self.api_key = os.getenv('OPEN_ROUTER_API_KEY')
         self.model = os.getenv('LLM_MODEL', 'openai/gpt-4o-mini')
         self.api_url = 'https://openrouter.ai/api/v1/chat/completions'
+        # how many articles are requested at once (at least one, so BLOG_MAX_WORKERS=0 still runs), and how long to wait for one (seconds)
+        self.max_workers = max(1, max_workers or int(os.getenv('BLOG_MAX_WORKERS', '4')))
+        self.timeout = timeout or float(os.getenv('LLM_TIMEOUT', '120'))
+        # one session for all requests, so connections are kept alive and reused
+        self.session = requests.Session()
+        self.pool_size = 0
+        self._size_pool(self.max_workers)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+        })
+
+    def _size_pool(self, size):
+        """Make sure the session keeps at least `size` connections, one per request in flight"""
+        if size <= self.pool_size:
+            return
+        old_adapter = self.session.adapters.get('https://')
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=size))
+        if old_adapter is not None:
+            old_adapter.close()
+        self.pool_size = size
         
     def generate_article(self, title, details=""):
         """Generate a blog article using OpenRouter API"""
@@ -27,11 +50,6 @@ The article should be:
 
 Please provide the full article content."""
 
-        headers = {
-            'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json',
-        }
-        
         data = {
             'model': self.model,
             'messages': [
@@ -43,7 +61,7 @@ Please provide the full article content."""
         }
         
         try:
-            response = requests.post(self.api_url, headers=headers, json=data)
+            response = self.session.post(self.api_url, json=data, timeout=self.timeout)
             response.raise_for_status()
             result = response.json()
             content = result['choices'][0]['message']['content']
@@ -58,21 +76,34 @@ Please provide the full article content."""
             print(f"Error generating article: {e}")
             return None
     
-    def generate_multiple_articles(self, topics):
-        """Generate multiple articles from a list of topics"""
-        articles = []
-        
-        for i, topic in enumerate(topics, 1):
+    def generate_multiple_articles(self, topics, max_workers=None):
+        """Generate multiple articles from a list of topics, up to max_workers at a time
+
+        Articles are returned in the order of the topics; failed ones are left out.
+        """
+        max_workers = max(1, max_workers or self.max_workers)
+        # a smaller pool would drop the extra connections instead of keeping them alive
+        self._size_pool(max_workers)
+
+        def generate(numbered):
+            i, topic = numbered
             print(f"Generating article {i}/{len(topics)}: {topic['title']}")
             article = self.generate_article(topic['title'], topic.get('details', ''))
             
             if article:
-                articles.append(article)
                 print(f"[OK] Generated: {topic['title']}")
             else:
                 print(f"[FAILED] Failed: {topic['title']}")
+            return article
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(generate, enumerate(topics, 1)))
         
-        return articles
+        return [article for article in results if article]
+
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.session.close()
     
     def save_articles(self, articles, filename='articles.json'):
         """Save articles to a JSON file"""
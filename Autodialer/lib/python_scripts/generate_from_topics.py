@@ -16,6 +16,7 @@ def main():
     # Generate articles
     generator = BlogGenerator()
     articles = generator.generate_multiple_articles(topics)
+    generator.close()
     generator.save_articles(articles)
     
     print(f"Successfully generated {len(articles)} articles")
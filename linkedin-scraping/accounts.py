@@ -0,0 +1,157 @@
+import json
+import time
+import threading
+import collections
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from config import get_config
+from session_cache import SessionCache, default_session_cache
+
+# LinkedIn sends a session it doesn't trust to these pages: exact paths, and path prefixes
+CHALLENGE_PATHS = ("/login",)
+CHALLENGE_PATH_PREFIXES = ("/authwall", "/checkpoint/")
+
+SUCCESS = "success"
+TIMEOUT = "timeout"
+ERROR = "error"
+CHALLENGE = "challenge"
+
+
+def is_challenge_url(url):
+    """True if `url` is a login, authwall or verification page rather than the page asked for
+
+    Only the path is looked at, so a profile whose slug happens to contain
+    "login" or "authwall" isn't mistaken for one.
+    """
+    path = urlsplit(url or "").path
+    if path.startswith("/in/"):
+        return False
+    return path.rstrip("/") in CHALLENGE_PATHS or path.startswith(CHALLENGE_PATH_PREFIXES)
+
+
+class Account:
+    """A LinkedIn login and its health while scraping
+
+    The last ACCOUNT_HEALTH_WINDOW outcomes decide whether the account
+    stays in rotation: a verification challenge,
+    ACCOUNT_MAX_CONSECUTIVE_FAILURES failures in a row or an error rate
+    above ACCOUNT_MAX_ERROR_RATE bench it for a cooldown (see config.py).
+    """
+
+    def __init__(self, email, password=None, session_file=None):
+        self.email = email
+        self.password = password
+        self.session_file = session_file
+        self.counts = collections.Counter()
+        # outcomes kept to judge the account's health
+        self.recent = collections.deque(maxlen=get_config().account_health_window)
+        self.consecutive_failures = 0
+        self.benched_until = 0.0
+        self.benched_reason = ""
+        self._lock = threading.Lock()
+
+    def session_cache(self):
+        """Where this account's session is saved, or None when disabled with SESSION_CACHE=false"""
+        if self.session_file:
+            # the saved session may be the only credential this account has
+            return SessionCache(self.session_file)
+        return default_session_cache(self.email)
+
+    @property
+    def visited(self):
+        """Profiles visited with this account"""
+        return sum(self.counts.values())
+
+    def available(self):
+        return time.time() >= self.benched_until
+
+    def bench(self, seconds, reason):
+        with self._lock:
+            self.benched_until = max(self.benched_until, time.time() + seconds)
+            self.benched_reason = reason
+        print(f"Account {self.email} out of rotation for {seconds / 60:.0f} min: {reason}")
+
+    def record(self, outcome):
+        """Count a profile's outcome (SUCCESS, TIMEOUT, ERROR or CHALLENGE) and bench the account if it degraded"""
+        with self._lock:
+            self.counts[outcome] += 1
+            self.recent.append(outcome)
+            if outcome == SUCCESS:
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            failures = sum(1 for o in self.recent if o != SUCCESS)
+            error_rate = failures / len(self.recent)
+        config = get_config()
+        if outcome == CHALLENGE:
+            self.bench(config.account_challenge_cooldown, "verification challenge")
+        elif self.consecutive_failures >= config.account_max_consecutive_failures:
+            self.bench(config.account_cooldown, f"{self.consecutive_failures} failures in a row")
+        elif len(self.recent) >= self.recent.maxlen // 2 and error_rate > config.account_max_error_rate:
+            self.bench(config.account_cooldown, f"error rate {error_rate:.0%}")
+
+    def summary(self):
+        with self._lock:
+            recent = list(self.recent)
+            counts = dict(self.counts)
+        failures = sum(1 for o in recent if o != SUCCESS)
+        return {
+            "email": self.email,
+            "available": self.available(),
+            "benched_until": self.benched_until if not self.available() else None,
+            "benched_reason": self.benched_reason if not self.available() else "",
+            "profiles": sum(counts.values()),
+            "successes": counts.get(SUCCESS, 0),
+            "timeouts": counts.get(TIMEOUT, 0),
+            "errors": counts.get(ERROR, 0),
+            "challenges": counts.get(CHALLENGE, 0),
+            "recent_error_rate": failures / len(recent) if recent else 0.0,
+        }
+
+
+class AccountPool:
+    """The LinkedIn accounts scrape jobs rotate through"""
+
+    def __init__(self, accounts):
+        self.accounts = list(accounts)
+
+    @classmethod
+    def load(cls, path=None, email=None, password=None):
+        """Accounts from a JSON file (default ACCOUNTS_FILE), plus the LINKEDIN_EMAIL/LINKEDIN_PASSWORD one
+
+        The file holds a list of {"email", "password", "session_file"}
+        objects; "session_file" (a saved storage state) may stand in for the
+        password. A missing file just means the single env account.
+        """
+        config = get_config()
+        accounts = []
+        path = Path(path or config.accounts_file)
+        if path.exists():
+            for entry in json.loads(path.read_text(encoding="utf-8")):
+                accounts.append(Account(entry["email"], entry.get("password"), entry.get("session_file")))
+        email = email or config.email
+        if email and all(account.email != email for account in accounts):
+            accounts.insert(0, Account(email, password or config.password))
+        return cls(accounts)
+
+    def active(self, limit=None):
+        """Accounts in rotation, least used first so the load spreads evenly"""
+        available = [account for account in self.accounts if account.available()]
+        available.sort(key=lambda account: account.visited)
+        return available[:limit] if limit else available
+
+    def summary(self):
+        return [account.summary() for account in self.accounts]
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def default_account_pool():
+    """Process-wide pool, so account health carries over between jobs"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = AccountPool.load()
+    return _default_pool
@@ -1,25 +1,64 @@
 # app.py
 import os
 import json
-from flask import Flask, render_template, request, jsonify, send_file
+import atexit
+from flask import Flask, render_template, request, jsonify, send_file, abort, Response
 from pathlib import Path
-from scraper import scrape_profiles
+from config import get_config
+from scraper import scrape_profiles, resume_job
+from checkpoint import JobManifest
+from jobs import JobQueue
+from distributed import scrape_distributed
+from browser_pool import BrowserPool
+from url_normalizer import normalize_profile_urls, canonical_profile_url
+from accounts import default_account_pool
+from metrics import REGISTRY
 import threading
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
 
-# Store scraping status
-scraping_status = {
-    'is_scraping': False,
-    'current_profile': 0,
-    'total_profiles': 0,
-    'message': '',
-    'csv_path': None,
-    'stop_requested': False,
-    'has_successful_scrape': False,
-    'failed_urls': []
-}
+# read the settings (and .env) up front, so every module sees the same values
+get_config()
+
+# Warm browser shared by all scrape jobs, created and warmed up by create_app()
+browser_pool = None
+browser_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    global browser_pool
+    if not get_config().browser_pool:
+        return None
+    with browser_pool_lock:
+        if browser_pool is None:
+            browser_pool = BrowserPool()
+            atexit.register(browser_pool.close)
+            # launch the browser and log in now, so the first job doesn't wait for it
+            browser_pool.warm().add_done_callback(report_warm_up)
+    return browser_pool
+
+def report_warm_up(future):
+    if future.exception() is not None:
+        print(f"[ERROR] Could not warm up the browser pool: {future.exception()}")
+
+# Scrape jobs, queued and persisted across restarts; created by create_app()
+job_queue = None
+job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    global job_queue
+    with job_queue_lock:
+        if job_queue is None:
+            job_queue = JobQueue(run_scraper)
+            atexit.register(job_queue.close)
+    return job_queue
+
+def distributed_mode():
+    """Whether jobs are handed to worker containers (see distributed.py) instead of scraped here"""
+    return get_config().distributed
+
+# pages a single job may scrape with at once
+MAX_WORKERS = 10
 
 # default LinkedIn profiles
 DEFAULT_PROFILES = [
@@ -51,95 +90,210 @@ def index():
 
 @app.route('/scrape', methods=['POST'])
 def scrape():
-    global scraping_status
-    
-    if scraping_status['is_scraping']:
-        return jsonify({'error': 'Scraping already in progress'}), 400
-    
     data = request.json
-    profile_urls = [url.strip() for url in data.get('profiles', []) if url.strip()]
+    batch = normalize_profile_urls(data.get('profiles', []))
+    profile_urls = batch.urls
     
     if not profile_urls:
+        if batch.rejected:
+            return jsonify({'error': 'No valid LinkedIn profile URLs provided', 'rejected_urls': batch.rejected}), 400
         return jsonify({'error': 'No profile URLs provided'}), 400
     
-    # Reset status
-    scraping_status = {
-        'is_scraping': True,
-        'current_profile': 0,
-        'total_profiles': len(profile_urls),
-        'message': 'Starting scraper...',
-        'csv_path': None,
-        'stop_requested': False,
-        'has_successful_scrape': False,
-        'failed_urls': []
-    }
+    rate_limit = None
+    if data.get('rate_limit'):
+        try:
+            profiles_per_hour = data['rate_limit'].get('profiles_per_hour')
+            burst = data['rate_limit'].get('burst')
+            if isinstance(profiles_per_hour, bool) or isinstance(burst, bool):
+                raise TypeError(data['rate_limit'])
+            rate_limit = {
+                'profiles_per_hour': float(profiles_per_hour) if profiles_per_hour is not None else None,
+                'burst': int(burst) if burst is not None else None,
+            }
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({'error': 'Invalid rate_limit'}), 400
+        # a budget of zero or less would never let the job take a profile
+        if rate_limit['profiles_per_hour'] is not None and not rate_limit['profiles_per_hour'] > 0:
+            return jsonify({'error': 'rate_limit.profiles_per_hour must be positive'}), 400
+        if rate_limit['burst'] is not None and rate_limit['burst'] < 1:
+            return jsonify({'error': 'rate_limit.burst must be at least 1'}), 400
+    try:
+        priority = int(data.get('priority') or 0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid priority'}), 400
+    workers = data.get('workers')
+    if workers is not None:
+        try:
+            if isinstance(workers, bool):
+                raise TypeError(workers)
+            workers = int(workers)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid workers'}), 400
+        if not 1 <= workers <= MAX_WORKERS:
+            return jsonify({'error': f'workers must be between 1 and {MAX_WORKERS}'}), 400
+    # true for every profile, or a list of the profiles that need it
+    contact_info = data.get('contact_info')
+    if not isinstance(contact_info, (bool, list, type(None))):
+        return jsonify({'error': 'Invalid contact_info'}), 400
+    if isinstance(contact_info, list):
+        invalid = [url for url in contact_info if not isinstance(url, str) or canonical_profile_url(url) is None]
+        if invalid:
+            return jsonify({'error': 'contact_info lists URLs that are not LinkedIn profiles', 'invalid': invalid}), 400
+    
+    if distributed_mode():
+        # worker containers scrape with their own settings; these only apply to scrapes run here
+        unsupported = [name for name, value in (('workers', workers), ('rate_limit', rate_limit),
+                                                ('contact_info', contact_info)) if value]
+        if unsupported:
+            return jsonify({'error': f"{', '.join(unsupported)} not supported with DISTRIBUTED=true"}), 400
     
-    # Run scraping in background thread
-    thread = threading.Thread(target=run_scraper, args=(profile_urls,))
-    thread.start()
+    # Queue the job; it starts as soon as a job worker is free
+    job = get_job_queue().submit(
+        profile_urls,
+        priority=priority,
+        status={
+            # rejected lines are reported alongside the profiles that failed
+            'failed_urls': list(batch.rejected),
+            'duplicates_removed': batch.duplicates,
+            'rejected_urls': batch.rejected,
+        },
+        workers=workers,
+        rate_limit=rate_limit,
+        contact_info=contact_info,
+    )
     
-    return jsonify({'success': True, 'message': 'Scraping started'})
+    return jsonify({
+        'success': True,
+        'message': 'Scraping queued',
+        'job_id': job.id,
+        'profiles': len(profile_urls),
+        'duplicates_removed': batch.duplicates,
+        'rejected_urls': batch.rejected,
+    })
 
-def run_scraper(profile_urls):
-    global scraping_status
-    print(f"[DEBUG] Starting scraper with {len(profile_urls)} URLs")
-    try:
-        csv_path = scrape_profiles(profile_urls, status_callback=update_status, stop_check=check_stop)
-        print(f"[DEBUG] Scraper completed. CSV path: {csv_path}")
-        scraping_status['is_scraping'] = False
-        if scraping_status['stop_requested']:
-            scraping_status['message'] = 'Scraping stopped by user!'
-        else:
-            scraping_status['message'] = 'Scraping completed!'
-        scraping_status['csv_path'] = csv_path
-    except Exception as e:
-        print(f"[ERROR] Scraper failed with error: {e}")
-        import traceback
-        traceback.print_exc()
-        scraping_status['is_scraping'] = False
-        scraping_status['message'] = f'Error: {str(e)}'
-        # Keep csv_path if we have partial results
-        if not scraping_status['csv_path']:
-            scraping_status['csv_path'] = None
-
-def update_status(current, total, message, csv_path=None, has_success=False, failed_url=None):
-    global scraping_status
-    scraping_status['current_profile'] = current
-    scraping_status['total_profiles'] = total
-    scraping_status['message'] = message
-    if csv_path:
-        scraping_status['csv_path'] = csv_path
-    if has_success:
-        scraping_status['has_successful_scrape'] = True
-    if failed_url:
-        if failed_url not in scraping_status['failed_urls']:
-            scraping_status['failed_urls'].append(failed_url)
-
-def check_stop():
-    global scraping_status
-    return scraping_status['stop_requested']
+def run_scraper(job, resume=False):
+    """JobQueue runner: scrape one job's profiles on the shared browser pool"""
+    print(f"[DEBUG] Starting job {job.id} with {len(job.profile_urls)} URLs")
+    kwargs = dict(
+        status_callback=job.update_status,
+        stop_check=job.check_stop,
+        workers=job.options.get('workers'),
+        pool=get_browser_pool(),
+        rate_limit=job.options.get('rate_limit'),
+        contact_info=job.options.get('contact_info'),
+    )
+    if distributed_mode():
+        # worker containers do the scraping, this process merges their results; the
+        # job's manifest lets a resumed job carry on with the URLs not merged yet
+        csv_path = scrape_distributed(job.profile_urls, status_callback=job.update_status,
+                                      stop_check=job.check_stop, job_id=job.id)
+    elif resume and JobManifest.load(job.id) is not None:
+        csv_path = resume_job(job.id, **kwargs)
+    else:
+        csv_path = scrape_profiles(job.profile_urls, job_id=job.id, **kwargs)
+    print(f"[DEBUG] Job {job.id} completed. CSV path: {csv_path}")
+    return csv_path
+
+def get_job(job_id):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        abort(404)
+    return job
+
+def latest_job():
+    jobs = get_job_queue().list()
+    return max(jobs, key=lambda job: job.created) if jobs else None
+
+@app.route('/accounts')
+def list_accounts():
+    """Per-account profile counts, error rates and whether each is in rotation"""
+    return jsonify(default_account_pool().summary())
+
+@app.route('/jobs')
+def list_jobs():
+    return jsonify([job.to_dict() for job in get_job_queue().list()])
+
+@app.route('/status/<job_id>')
+def job_status(job_id):
+    return jsonify(get_job(job_id).to_dict())
+
+@app.route('/events/<job_id>')
+def job_events(job_id):
+    """Server-Sent Events stream of a job's progress, pushed as it changes"""
+    job = get_job(job_id)
+    
+    def stream():
+        for event, data in job.events():
+            if event is None:
+                # keep-alive for proxies that drop idle connections
+                yield ': ping\n\n'
+            else:
+                yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+    
+    return Response(stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/stop/<job_id>', methods=['POST'])
+def stop_job(job_id):
+    if get_job_queue().stop(get_job(job_id).id):
+        return jsonify({'success': True, 'message': 'Stop requested'})
+    return jsonify({'error': 'Job is not running'}), 400
+
+@app.route('/download/<job_id>')
+def download_job(job_id):
+    csv_path = get_job(job_id).tracker.get('csv_path')
+    if csv_path and os.path.exists(csv_path):
+        return send_file(
+            csv_path,
+            as_attachment=True,
+            download_name=f"linkedin_profiles_{job_id}{Path(csv_path).suffix}"
+        )
+    return jsonify({'error': 'No CSV file available'}), 404
+
+# The endpoints below act on the most recently submitted job
 
 @app.route('/status')
 def status():
-    return jsonify(scraping_status)
+    job = latest_job()
+    if job is None:
+        return jsonify({'is_scraping': False, 'current_profile': 0, 'total_profiles': 0, 'message': '',
+                        'csv_path': None, 'has_successful_scrape': False, 'failed_urls': []})
+    return jsonify(job.to_dict())
 
 @app.route('/stop', methods=['POST'])
 def stop_scraping():
-    global scraping_status
-    if scraping_status['is_scraping']:
-        scraping_status['stop_requested'] = True
+    job = latest_job()
+    if job is not None and get_job_queue().stop(job.id):
         return jsonify({'success': True, 'message': 'Stop requested'})
     return jsonify({'error': 'No scraping in progress'}), 400
 
+@app.route('/metrics')
+def metrics():
+    """Phase timing histograms of all scrapes in this process, for Prometheus"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/download')
 def download():
-    if scraping_status['csv_path'] and os.path.exists(scraping_status['csv_path']):
-        return send_file(
-            scraping_status['csv_path'],
-            as_attachment=True,
-            download_name='linkedin_profiles.csv'
-        )
-    return jsonify({'error': 'No CSV file available'}), 404
+    job = latest_job()
+    if job is None:
+        return jsonify({'error': 'No CSV file available'}), 404
+    return download_job(job.id)
+
+def create_app():
+    """The app with its job queue and warm browser started, so jobs cut short by a restart resume right away
+
+    Importing this module starts nothing; servers load the app through this
+    factory (`flask --app "app:create_app()" run`). The job queue must run in
+    one process only: a second process fails here rather than resuming the
+    same jobs again (see JobStore). The debug reloader's watcher process
+    serves nothing, so only the child it runs the app in starts the queue.
+    """
+    if not app.debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        get_job_queue()
+        if not distributed_mode():
+            get_browser_pool()
+    return app
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    app.debug = True
+    create_app().run(port=5000)
@@ -0,0 +1,180 @@
+import gzip
+import time
+import queue
+import random
+import threading
+from pathlib import Path
+from datetime import datetime
+
+from config import get_config
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used without it
+    zstandard = None
+
+
+MODES = ("always", "on_error", "sampled", "off")
+ARTIFACT_SUFFIXES = (".html", ".html.gz", ".html.zst", ".png", ".jpg")
+
+
+def default_compression():
+    return "zstd" if zstandard is not None else "gzip"
+
+def compress_html(html, compression):
+    """Return (suffix, bytes) for an HTML snapshot"""
+    data = html.encode("utf-8")
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression needs the zstandard package")
+        return ".html.zst", zstandard.ZstdCompressor(level=3).compress(data)
+    if compression == "gzip":
+        return ".html.gz", gzip.compress(data, compresslevel=6)
+    return ".html", data
+
+def read_html(path):
+    """Read an HTML snapshot written by ArtifactWriter, compressed or not"""
+    path = Path(path)
+    data = path.read_bytes()
+    if path.name.endswith(".gz"):
+        data = gzip.decompress(data)
+    elif path.name.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError("reading .zst snapshots needs the zstandard package")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return data.decode("utf-8")
+
+
+class ArtifactWriter:
+    """Saves page snapshots (HTML) and screenshots according to a capture policy
+
+    `html_mode` and `screenshot_mode` are each one of:
+      always    capture every profile
+      on_error  capture only failed or empty profiles
+      sampled   capture failures plus a `sample_rate` share of the rest
+      off       never capture
+    The browser only produces the bytes; compression and disk writes happen
+    on a background thread. The directory is rotated by total size and age.
+    """
+
+    def __init__(self, directory=None, html_mode=None, screenshot_mode=None, sample_rate=None,
+                 compression=None, jpeg_quality=None, max_bytes=None, max_age_days=None):
+        config = get_config()
+        self.directory = Path(directory or config.artifact_dir)
+        self.html_mode = html_mode or config.html_snapshots
+        self.screenshot_mode = screenshot_mode or config.screenshots
+        for mode in (self.html_mode, self.screenshot_mode):
+            if mode not in MODES:
+                raise ValueError(f"Unknown artifact mode: {mode}")
+        self.sample_rate = float(sample_rate if sample_rate is not None else config.artifact_sample_rate)
+        self.compression = compression or config.html_compression or default_compression()
+        self.jpeg_quality = int(jpeg_quality or config.screenshot_quality)
+        self.max_bytes = int(max_bytes or config.artifact_max_bytes)
+        self.max_age = float(max_age_days * 86400 if max_age_days else config.artifact_max_age)
+        self.dropped = 0
+        self._writes = 0
+        self._queue = queue.Queue(maxsize=100)
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def _wants(self, mode, failed, sampled):
+        if mode == "always":
+            return True
+        if mode in ("on_error", "sampled") and failed:
+            return True
+        return mode == "sampled" and sampled
+
+    async def capture(self, page, slug, failed=False, html=None):
+        """Grab the page's HTML and/or screenshot if the policy asks for them, and queue the write"""
+        sampled = random.random() < self.sample_rate
+        want_html = self._wants(self.html_mode, failed, sampled)
+        want_shot = self._wants(self.screenshot_mode, failed, sampled)
+        if not (want_html or want_shot):
+            return
+
+        screenshot = None
+        if want_shot:
+            try:
+                screenshot = await page.screenshot(type="jpeg", quality=self.jpeg_quality, full_page=True)
+            except Exception:
+                pass
+        if want_html and html is None:
+            try:
+                html = await page.content()
+            except Exception:
+                html = None
+        self.submit(slug, html if want_html else None, screenshot)
+
+    def submit(self, slug, html=None, screenshot=None):
+        """Queue an artifact for the writer thread without blocking; called from the event loop"""
+        ts = datetime.now().strftime("%Y%m%dT%H%M%S")
+        try:
+            self._queue.put_nowait((f"{slug}_{ts}", html, screenshot))
+        except queue.Full:
+            # the disk can't keep up; artifacts are best effort, scraping must not wait for them
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                print(f"Artifact writer is behind, {self.dropped} snapshots dropped so far")
+
+    def flush(self):
+        """Block until every queued artifact is on disk"""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._write(*item)
+            except Exception as e:
+                print(f"Failed to write artifacts for {item[0]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name, html, screenshot):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if html:
+            suffix, data = compress_html(html, self.compression)
+            (self.directory / f"{name}{suffix}").write_bytes(data)
+        if screenshot:
+            (self.directory / f"{name}.jpg").write_bytes(screenshot)
+        self._writes += 1
+        if self._writes % 50 == 1:
+            self.rotate()
+
+    def rotate(self):
+        """Delete artifacts older than max_age, then the oldest ones until under max_bytes"""
+        files = []
+        for path in self.directory.iterdir():
+            if path.name.endswith(ARTIFACT_SUFFIXES):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if now - mtime <= self.max_age and total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+_default_writer = None
+_default_writer_lock = threading.Lock()
+
+def default_artifact_writer():
+    """Process-wide writer configured from the settings (see config.py), or None if everything is off"""
+    global _default_writer
+    config = get_config()
+    if config.html_snapshots == "off" and config.screenshots == "off":
+        return None
+    with _default_writer_lock:
+        if _default_writer is None:
+            _default_writer = ArtifactWriter()
+    return _default_writer
@@ -0,0 +1,369 @@
+"""Benchmark the scraper end to end against a local fake LinkedIn, without network access
+
+A fixture server stands in for linkedin.com (see LINKEDIN_BASE_URL in
+config.py): a login form that sets the auth cookie, the feed, and profile
+pages served after a configurable latency. Profiles come in the current
+layout, the older layout the fallback selectors target and a layout with
+missing sections, or from recorded snapshots (--snapshots), and every 20th
+profile is a 404. Each mode runs scrape_profiles in its own process and
+reports throughput, per-profile latency, the slowest phases and memory.
+
+Usage: python benchmark.py [--profiles 40] [--modes serial,concurrent,html] [--workers 4]
+                           [--latency 0.2,0.6] [--snapshots output/snapshots] [-o results.json] [--compare old.json]
+"""
+import sys
+import json
+import time
+import zlib
+import random
+import argparse
+import tempfile
+import threading
+import collections
+import multiprocessing
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:
+    # not on Windows; memory is then left out of the report
+    resource = None
+
+from metrics import PhaseTimings
+from pacing import Pacing, parse_range
+
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench"
+AUTH_COOKIE = "li_at=bench"
+# (workers, extract mode, contact info pass) per mode; None workers means --workers
+MODES = {
+    "serial": (1, "evaluate", False),
+    "concurrent": (None, "evaluate", False),
+    "html": (None, "html", False),
+    "locators": (1, "locators", False),
+    "contact": (None, "evaluate", True),
+}
+
+LOGIN_PAGE = """<!doctype html><html><body>
+<form method="post" action="/login">
+  <input id="username" name="session_key"><input id="password" name="session_password" type="password">
+  <button type="submit">Sign in</button>
+</form></body></html>"""
+
+FEED_PAGE = "<!doctype html><html><body><main><h2>Feed</h2></main></body></html>"
+
+PAGE_SHELL = """<!doctype html><html><head><title>{name} | LinkedIn</title></head><body><main>
+{body}
+<div hidden>{filler}</div>
+</main></body></html>"""
+
+CURRENT_LAYOUT = """
+<div class="ph5">
+  <button class="pv-top-card-profile-picture"><img class="pv-top-card-profile-picture__image" src="/media/{slug}.jpg"></button>
+  <h1>{name}</h1>
+  <div class="text-body-medium">Staff Engineer at Example Corp</div>
+  <span class="text-body-small inline t-black--light break-words">Berlin, Germany</span>
+  <a id="top-card-text-details-contact-info" href="#" onclick="document.getElementById('contact').hidden = false; return false;">Contact info</a>
+</div>
+<section><div id="about"></div><div class="inline-show-more-text">Builds scrapers and benchmarks them.</div></section>
+<section><div id="experience"></div><ul>{experience}</ul></section>
+<section><div id="education"></div><ul>{education}</ul></section>
+{contact}"""
+
+# shown right away on the profile's contact info overlay URL, otherwise opened by the button
+CONTACT_DIALOG = """<div role="dialog" id="contact"{hidden}>
+  <section class="pv-contact-info__contact-type ci-email"><a href="mailto:{slug}@example.com">{slug}@example.com</a></section>
+  <section class="pv-contact-info__contact-type ci-phone"><span class="t-14">+49 30 1234567</span></section>
+  <button aria-label="Dismiss" onclick="document.getElementById('contact').hidden = true;">Close</button>
+</div>"""
+
+CURRENT_EXPERIENCE = """<li class="artdeco-list__item">
+  <div class="display-flex align-items-center"><span aria-hidden="true">Engineer {i}</span></div>
+  <span class="t-14 t-normal"><span aria-hidden="true">Company {i} · Full-time</span></span>
+  <span class="pvs-entity__caption-wrapper">Jan 20{i:02d} - Dec 20{j:02d} · 1 yr</span>
+</li>"""
+
+CURRENT_EDUCATION = """<li class="artdeco-list__item">
+  <span class="mr1 hoverable-link-text t-bold"><span aria-hidden="true">University {i}</span></span>
+  <span class="t-14 t-normal"><span aria-hidden="true">MSc Computer Science</span></span>
+</li>"""
+
+# the pre-2022 profile markup that the fallback selectors target
+LEGACY_LAYOUT = """
+<h1 class="text-heading-xlarge">{name}</h1>
+<ul class="pv-top-card--list"><li>Engineering Manager</li></ul>
+<ul class="pv-top-card--list-bullet"><li>Lisbon, Portugal</li></ul>
+<button class="pv-top-card-profile-picture"><img src="/media/{slug}.jpg"></button>
+<section class="pv-about-section"><p>Has been on LinkedIn for a long time.</p></section>
+<section id="experience-section"><ul>{experience}</ul></section>
+<section id="education-section"><ul>{education}</ul></section>"""
+
+LEGACY_EXPERIENCE = """<li><h3>Manager {i}</h3><p class="pv-entity__secondary-title">Company {i}</p></li>"""
+LEGACY_EDUCATION = """<li><h3>College {i}</h3><p class="pv-entity__degree-name">BSc</p></li>"""
+
+# top card only: no about, experience or education sections
+SPARSE_LAYOUT = """
+<div class="ph5"><h1>{name}</h1><div class="text-body-medium">Open to work</div></div>"""
+
+
+def filler(kb):
+    """Hidden markup to bring a page up to a realistic weight"""
+    chunk = '<div class="artdeco-card"><span class="visually-hidden">padding</span></div>'
+    return chunk * (kb * 1024 // len(chunk))
+
+def fixture_page(slug, layout, page_kb, overlay=False):
+    """HTML of a synthetic profile in one of the layouts above, with its contact info open for `overlay`"""
+    name = slug.replace("-", " ").title()
+    contact = CONTACT_DIALOG.format(slug=slug, hidden="" if overlay else " hidden")
+    if layout == "legacy":
+        body = LEGACY_LAYOUT.format(
+            name=name, slug=slug,
+            experience="".join(LEGACY_EXPERIENCE.format(i=i) for i in range(3)),
+            education="".join(LEGACY_EDUCATION.format(i=i) for i in range(2)),
+        )
+    elif layout == "sparse":
+        body = SPARSE_LAYOUT.format(name=name)
+    else:
+        body = CURRENT_LAYOUT.format(
+            name=name, slug=slug,
+            experience="".join(CURRENT_EXPERIENCE.format(i=i, j=i + 1) for i in range(5)),
+            education="".join(CURRENT_EDUCATION.format(i=i) for i in range(2)),
+            contact=contact,
+        )
+    if overlay and layout != "current":
+        body += contact
+    return PAGE_SHELL.format(name=name, body=body, filler=filler(page_kb))
+
+
+class FixtureServer:
+    """Local HTTP server playing LinkedIn's login, feed and profile pages
+
+    Profile pages are answered after a random delay within `latency`
+    (min, max seconds); without the auth cookie they redirect to the
+    authwall like the real site. `snapshots` (recorded HTML) replace the
+    synthetic layouts when given.
+    """
+
+    LAYOUTS = ("current", "legacy", "sparse")
+
+    def __init__(self, latency=(0.0, 0.0), page_kb=200, snapshots=None, port=0):
+        self.latency = latency
+        self.page_kb = page_kb
+        self.snapshots = snapshots or []
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fixture-server", daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def profile_page(self, slug, overlay=False):
+        key = zlib.crc32(slug.encode())
+        if self.snapshots:
+            return self.snapshots[key % len(self.snapshots)]
+        return fixture_page(slug, self.LAYOUTS[key % len(self.LAYOUTS)], self.page_kb, overlay)
+
+    def _handler(self):
+        fixtures = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send(self, status, body="", headers=()):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def logged_in(self):
+                return AUTH_COOKIE in (self.headers.get("Cookie") or "")
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                if path == "/login":
+                    self.send(200, LOGIN_PAGE)
+                elif path.startswith("/feed"):
+                    if self.logged_in():
+                        self.send(200, FEED_PAGE)
+                    else:
+                        self.send(302, headers=[("Location", "/login")])
+                elif path.startswith("/in/"):
+                    time.sleep(random.uniform(*fixtures.latency))
+                    slug = path.split("/")[2]
+                    if not self.logged_in():
+                        self.send(302, headers=[("Location", "/authwall")])
+                    elif slug.startswith("missing-"):
+                        self.send(404, "<html><body><h1>Page not found</h1></body></html>")
+                    else:
+                        overlay = path.rstrip("/").endswith("/overlay/contact-info")
+                        self.send(200, fixtures.profile_page(slug, overlay))
+                else:
+                    self.send(404)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path.split("?")[0] == "/login":
+                    self.send(302, headers=[("Location", "/feed/"), ("Set-Cookie", f"{AUTH_COOKIE}; Path=/; HttpOnly")])
+                else:
+                    self.send(404)
+
+        return Handler
+
+
+class SampledTimings(PhaseTimings):
+    """PhaseTimings that keeps every duration for percentiles, outside the app's /metrics histograms"""
+
+    def __init__(self):
+        super().__init__(registry=None)
+        self.samples = collections.defaultdict(list)
+
+    def observe(self, name, seconds):
+        super().observe(name, seconds)
+        self.samples[name].append(seconds)
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+def peak_rss_mb():
+    """Peak RSS of this process and of its largest finished child (the browser), in MB"""
+    if resource is None:
+        return None, None
+    # kilobytes on Linux, bytes on macOS
+    scale = 1 / 1024 / 1024 if sys.platform == "darwin" else 1 / 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return round(own, 1), round(children, 1)
+
+
+def run_mode(mode, urls, base_url, workers, extract_mode, contact_info, directory):
+    """Run one scrape against the fixture server and measure it; runs in a fresh process"""
+    directory = Path(directory) / mode
+    from config import ScraperConfig, set_config
+    from accounts import Account, AccountPool
+    from scraper import scrape_profiles
+
+    # everything the scrape writes stays in the benchmark's directory, and nothing throttles it
+    set_config(ScraperConfig(email=BENCH_EMAIL, password=BENCH_PASSWORD, output_dir=directory,
+                             output_format="jsonl", extract_mode=extract_mode, base_url=base_url, session_cache=False,
+                             rate_limit_per_hour=100_000_000, rate_limit_burst=1000))
+    no_pacing = Pacing(delays={outcome: (0.0, 0.0) for outcome in ("success", "timeout", "invalid", "error")},
+                       dwell=(0.0, 0.0), stagger=(0.0, 0.0))
+    timings = SampledTimings()
+    start = time.perf_counter()
+    output = scrape_profiles(urls, workers=workers, accounts=AccountPool([Account(BENCH_EMAIL, BENCH_PASSWORD)]),
+                             profile_cache=False, pacing=no_pacing, timings=timings, contact_info=contact_info)
+    elapsed = time.perf_counter() - start
+
+    with open(output, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    profile_times = timings.samples["profile"]
+    startup = sum(timings.samples["browser_launch"]) + sum(timings.samples["login"])
+    own_mb, browser_mb = peak_rss_mb()
+    return {
+        "mode": mode,
+        "workers": workers,
+        "extract_mode": extract_mode,
+        "profiles": len(records),
+        "errors": sum(1 for rec in records if rec.get("error")),
+        "seconds": round(elapsed, 2),
+        "startup_seconds": round(startup, 2),
+        "profiles_per_second": round(len(records) / elapsed, 2) if elapsed else None,
+        "p50": round(percentile(profile_times, 50) or 0, 3),
+        "p95": round(percentile(profile_times, 95) or 0, 3),
+        "rss_mb": own_mb,
+        "browser_rss_mb": browser_mb,
+        "phases": dict(list(timings.summary().items())[:6]),
+    }
+
+
+def print_results(results, baseline=None):
+    header = f"{'mode':<12}{'workers':>8}{'ok':>6}{'errors':>8}{'wall s':>9}{'prof/s':>9}{'p50 s':>8}{'p95 s':>8}{'rss MB':>9}{'browser MB':>12}"
+    print(header)
+    for r in results:
+        print(f"{r['mode']:<12}{r['workers']:>8}{r['profiles'] - r['errors']:>6}{r['errors']:>8}{r['seconds']:>9}"
+              f"{r['profiles_per_second']:>9}{r['p50']:>8}{r['p95']:>8}{str(r['rss_mb']):>9}{str(r['browser_rss_mb']):>12}")
+    for r in results:
+        phases = ", ".join(f"{name} {s['total']}s" for name, s in r["phases"].items())
+        print(f"  {r['mode']}: startup {r['startup_seconds']}s; slowest phases: {phases}")
+    if baseline:
+        previous = {r["mode"]: r for r in baseline}
+        print("Compared with the baseline:")
+        for r in results:
+            old = previous.get(r["mode"])
+            if old and old["profiles_per_second"] and old["p95"]:
+                print(f"  {r['mode']}: throughput x{r['profiles_per_second'] / old['profiles_per_second']:.2f}, "
+                      f"p95 x{r['p95'] / old['p95']:.2f}")
+
+
+def load_snapshots(directory):
+    from artifacts import read_html
+    from offline_parser import find_snapshots
+    return [read_html(path) for path in find_snapshots(directory)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scrape_profiles against a local fake LinkedIn")
+    parser.add_argument("--profiles", type=int, default=40, help="profiles per mode")
+    parser.add_argument("--modes", default="serial,concurrent,html", help=f"comma separated, of {', '.join(MODES)}")
+    parser.add_argument("--workers", type=int, default=4, help="workers of the concurrent modes")
+    parser.add_argument("--latency", default="0.2,0.6", help="min,max seconds the server takes per profile page")
+    parser.add_argument("--page-kb", type=int, default=200, help="size of the synthetic profile pages")
+    parser.add_argument("--snapshots", default=None, help="serve recorded snapshots from this directory instead")
+    parser.add_argument("-o", "--output", default=None, help="write the results as JSON")
+    parser.add_argument("--compare", default=None, help="results JSON of an earlier run to compare with")
+    args = parser.parse_args(argv)
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(unknown)}")
+    snapshots = load_snapshots(args.snapshots) if args.snapshots else None
+    urls = [
+        f"https://www.linkedin.com/in/{'missing' if i % 20 == 19 else 'bench'}-{i}/"
+        for i in range(args.profiles)
+    ]
+
+    server = FixtureServer(parse_range(args.latency, (0.0, 0.0)), args.page_kb, snapshots).start()
+    print(f"Fixture server on {server.url}, {args.profiles} profiles per mode")
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="linkedin-bench-") as directory:
+            for mode in modes:
+                workers, extract_mode, contact_info = MODES[mode]
+                # a fresh process per mode, so memory and the account's state don't carry over
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+                    results.append(executor.submit(run_mode, mode, urls, server.url, workers or args.workers,
+                                                   extract_mode, contact_info, directory).result())
+    finally:
+        server.close()
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else None
+    print_results(results, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import time
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from config import get_config
+from scraper import launch_browser, new_context, new_page, ensure_logged_in
+from session_cache import default_session_cache, session_is_valid
+from resource_blocker import default_resource_blocker
+from accounts import default_account_pool
+
+
+class PooledContext:
+    def __init__(self, context):
+        self.context = context
+        # profiles visited with this context, used to recycle it
+        self.pages_used = 0
+        self.last_used = time.monotonic()
+
+
+class BrowserPool:
+    """Long-lived browser whose logged-in contexts are leased to scrape jobs
+
+    The pool owns a background event loop thread; jobs run on it through
+    `run()`, so back-to-back jobs reuse a warm context instead of launching
+    Chromium and logging in again. At most `size` contexts are leased at
+    once. A context is recycled after `max_pages` profiles to cap Chromium's
+    memory growth, and one that sat idle for more than `check_after` seconds
+    is health checked before it is handed out again. Contexts belong to one
+    LinkedIn account (see accounts.py) and are only reused for that account.
+    """
+
+    def __init__(self, size=None, max_pages=None, check_after=300, session_cache=None, blocker=None):
+        config = get_config()
+        self.size = size or config.browser_pool_size
+        self.max_pages = max_pages or config.browser_pool_max_pages
+        self.check_after = check_after
+        self.session_cache = session_cache if session_cache is not None else default_session_cache(config.email)
+        self.blocker = blocker if blocker is not None else default_resource_blocker()
+        self._playwright = None
+        self._browser = None
+        # idle contexts by account email, and a lock per account so it logs in once at a time
+        self._idle = {}
+        self._opening = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+        # asyncio primitives must be created on the pool's loop
+        self._slots, self._browser_lock = self.run(self._create_primitives())
+
+    async def _create_primitives(self):
+        return asyncio.Semaphore(self.size), asyncio.Lock()
+
+    def run(self, coro):
+        """Run `coro` on the pool's event loop and block until it finishes"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def warm(self):
+        """Start the browser and log in one context ahead of the first job, without blocking"""
+        return asyncio.run_coroutine_threadsafe(self._warm(), self._loop)
+
+    async def _warm(self):
+        accounts = default_account_pool().active()
+        async with self.lease(accounts[0] if accounts else None):
+            pass
+
+    async def _get_browser(self):
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                # contexts of a crashed browser are gone with it
+                self._idle.clear()
+                self._browser = await launch_browser(self._playwright)
+        return self._browser
+
+    async def _open_context(self, account=None):
+        browser = await self._get_browser()
+        session_cache = account.session_cache() if account else self.session_cache
+        storage_state = session_cache.load() if session_cache else None
+        context = await new_context(browser, storage_state=storage_state, blocker=self.blocker)
+        page = await new_page(context)
+        try:
+            await ensure_logged_in(page, session_cache, restored=storage_state is not None, account=account)
+        except Exception:
+            await context.close()
+            raise
+        await page.close()
+        return PooledContext(context)
+
+    async def _healthy(self, pooled):
+        if pooled.pages_used >= self.max_pages:
+            return False
+        if self._browser is None or not self._browser.is_connected():
+            return False
+        if pooled.context.browser is not self._browser:
+            # opened in a browser that has since been relaunched
+            return False
+        if time.monotonic() - pooled.last_used < self.check_after:
+            return True
+        return await session_is_valid(pooled.context)
+
+    async def _take_idle(self, key):
+        """A healthy idle context of account `key`, or None; unhealthy ones found on the way are closed"""
+        idle = self._idle.setdefault(key, [])
+        while idle:
+            candidate = idle.pop()
+            if await self._healthy(candidate):
+                return candidate
+            await self._discard(candidate)
+        return None
+
+    async def _discard(self, pooled):
+        try:
+            await pooled.context.close()
+        except Exception:
+            pass
+
+    @asynccontextmanager
+    async def lease(self, account=None, wait=True):
+        """Lease a PooledContext logged in as `account`, returning it to the pool afterwards
+
+        With wait=False, yields None instead of waiting when every slot is in use.
+        """
+        if not wait and self._slots.locked():
+            yield None
+            return
+        async with self._slots:
+            key = account.email if account else None
+            pooled = await self._take_idle(key)
+            if pooled is None:
+                async with self._opening.setdefault(key, asyncio.Lock()):
+                    # a lease that was logging the account in meanwhile (e.g. warm()) may have returned its context
+                    pooled = await self._take_idle(key) or await self._open_context(account)
+
+            ok = False
+            try:
+                yield pooled
+                ok = True
+            finally:
+                pooled.last_used = time.monotonic()
+                if ok and pooled.pages_used < self.max_pages:
+                    # looked up again: a browser relaunch during the lease clears the idle lists
+                    self._idle.setdefault(key, []).append(pooled)
+                else:
+                    await self._discard(pooled)
+
+    async def _close(self):
+        for idle in self._idle.values():
+            for pooled in idle:
+                await self._discard(pooled)
+        self._idle.clear()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self):
+        if not self._loop.is_running():
+            return
+        self.run(self._close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
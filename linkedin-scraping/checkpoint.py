@@ -0,0 +1,125 @@
+import json
+import secrets
+from pathlib import Path
+from datetime import datetime
+
+from config import get_config
+from sinks import JsonlSink
+
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+def new_job_id():
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(3)}"
+
+
+class JobManifest:
+    """Per-job checkpoint recording each URL's state and attempt count
+
+    The manifest is an append-only JSONL log next to the job output: a
+    header with the job's URLs and output file, then one event per finished
+    URL. Replaying it on load gives the current state, so updates cost one
+    appended line however large the batch is.
+    """
+
+    def __init__(self, job_id, path, output_path, output_format):
+        self.job_id = job_id
+        self.path = Path(path)
+        self.output_path = output_path
+        self.output_format = output_format
+        self.urls = []
+        self.states = {}
+        self.attempts = {}
+        self.errors = {}
+        self._log = None
+
+    @staticmethod
+    def path_for(job_id, directory=None):
+        return Path(directory or get_config().jobs_dir) / f"{job_id}.manifest.jsonl"
+
+    @classmethod
+    def load(cls, job_id, directory=None):
+        """Replay a job's manifest, or return None if the job is unknown"""
+        path = cls.path_for(job_id, directory)
+        if not path.exists():
+            return None
+        manifest = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # torn last line after a crash
+                    continue
+                if manifest is None:
+                    manifest = cls(job_id, path, event["output_path"], event.get("output_format", "csv"))
+                manifest._apply(event)
+        return manifest
+
+    @classmethod
+    def open(cls, job_id, profile_urls, output_path, output_format="csv", directory=None):
+        """Load the job's manifest, creating it on first use and registering any new URLs"""
+        manifest = cls.load(job_id, directory)
+        if manifest is None:
+            manifest = cls(job_id, cls.path_for(job_id, directory), str(output_path), output_format)
+            manifest._append({
+                "job_id": job_id,
+                "created": datetime.now().isoformat(),
+                "output_path": manifest.output_path,
+                "output_format": output_format,
+                "urls": list(dict.fromkeys(profile_urls)),
+            })
+            return manifest
+        new_urls = [url for url in dict.fromkeys(profile_urls) if url not in manifest.states]
+        if new_urls:
+            manifest._append({"urls": new_urls})
+        return manifest
+
+    def _apply(self, event):
+        for url in event.get("urls", []):
+            if url not in self.states:
+                self.urls.append(url)
+                self.states[url] = PENDING
+                self.attempts[url] = 0
+        if "url" in event:
+            url = event["url"]
+            self.states[url] = event["state"]
+            self.attempts[url] = self.attempts.get(url, 0) + 1
+            if event.get("error"):
+                self.errors[url] = event["error"]
+            else:
+                self.errors.pop(url, None)
+
+    def _append(self, event):
+        if self._log is None:
+            self._log = JsonlSink(self.path, fsync_every=20)
+        self._log.write(event)
+        self._apply(event)
+
+    def mark(self, url, state, error=None):
+        event = {"url": url, "state": state}
+        if error:
+            event["error"] = error
+        self._append(event)
+
+    def remaining(self, retry_failed=True, max_attempts=3):
+        """URLs still to scrape: pending ones, plus failures with attempts left"""
+        return [
+            url for url in self.urls
+            if self.states[url] == PENDING
+            or (retry_failed and self.states[url] == FAILED and self.attempts[url] < max_attempts)
+        ]
+
+    def counts(self):
+        counts = {PENDING: 0, DONE: 0, FAILED: 0}
+        for state in self.states.values():
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
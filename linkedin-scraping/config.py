@@ -0,0 +1,228 @@
+import os
+import threading
+from pathlib import Path
+
+
+DEFAULT_BASE_URL = "https://www.linkedin.com"
+PACING_OUTCOMES = ("success", "timeout", "invalid", "error")
+
+
+class ScraperConfig:
+    """Settings of the scraper, read from the environment (and .env) when first needed
+
+    Nothing is checked when it is built: a missing LinkedIn login only
+    fails the scrape that needs it (see require_credentials), so the app and
+    offline tools start without credentials. Modules read their settings
+    from here when they use them, never at import, so values from .env
+    apply everywhere. Files the scraper keeps (job store, checkpoints,
+    sessions, caches, snapshots, the SQLite work queue) live under
+    `output_dir` unless given a path of their own.
+    """
+
+    def __init__(self, email=None, password=None, output_dir="output", output_format="csv", fsync_every=10,
+                 workers=1, extract_mode="evaluate", headless=True, profile_wait_timeout=10.0,
+                 section_wait_timeout=2.0, contact_wait_timeout=5.0, base_url=DEFAULT_BASE_URL, contact_info=False,
+                 job_workers=2, job_store_path=None, jobs_dir=None, distributed=False,
+                 browser_pool=True, browser_pool_size=2, browser_pool_max_pages=200,
+                 session_cache=True, session_dir=None, session_ttl_hours=12.0,
+                 profile_cache=True, profile_cache_path=None, profile_cache_ttl_hours=24.0,
+                 artifact_dir=None, html_snapshots="always", screenshots="on_error", artifact_sample_rate=0.1,
+                 html_compression=None, screenshot_quality=60, artifact_max_mb=1024.0, artifact_max_age_days=7.0,
+                 block_resources=True, block_resource_types=("image", "font", "media"), block_domains=(),
+                 allow_domains=(), block_third_party_scripts=True,
+                 pacing_delays=None, page_dwell=None, pacing_stagger=None,
+                 rate_limit_per_hour=300.0, rate_limit_burst=3,
+                 rate_limit_backoff_base=30.0, rate_limit_backoff_max=600.0, retry_max_attempts=3,
+                 retry_backoff_base=30.0, retry_backoff_max=600.0, accounts_file="accounts.json",
+                 account_health_window=20, account_max_error_rate=0.5, account_max_consecutive_failures=5,
+                 account_cooldown=1800.0, account_challenge_cooldown=21600.0,
+                 work_queue_url=None, work_lease_seconds=300.0, work_max_attempts=3):
+        self.email = email
+        self.password = password
+        # where LinkedIn is reached; a local fixture server for benchmarks (see benchmark.py)
+        self.base_url = base_url.rstrip("/")
+        self.output_dir = Path(output_dir)
+        self.output_format = output_format.lower()
+        self.fsync_every = fsync_every
+        self.workers = workers
+        self.extract_mode = extract_mode
+        self.headless = headless
+        # waits for page readiness, in milliseconds as Playwright takes them
+        self.profile_wait_timeout = int(profile_wait_timeout * 1000)
+        self.section_wait_timeout = int(section_wait_timeout * 1000)
+        self.contact_wait_timeout = int(contact_wait_timeout * 1000)
+        # whether jobs fetch contact info (a second visit per profile) unless they say otherwise
+        self.contact_info = contact_info
+        # job queue (jobs.py) and per-job checkpoints (checkpoint.py)
+        self.job_workers = job_workers
+        self.job_store_path = Path(job_store_path or self.output_dir / "jobs.sqlite3")
+        self.jobs_dir = Path(jobs_dir or self.output_dir / "jobs")
+        # how the web app runs jobs: on worker containers (distributed.py) or on its warm browser (browser_pool.py)
+        self.distributed = distributed
+        self.browser_pool = browser_pool
+        self.browser_pool_size = browser_pool_size
+        self.browser_pool_max_pages = browser_pool_max_pages
+        # saved logins (session_cache.py) and recently scraped profiles (profile_cache.py)
+        self.session_cache = session_cache
+        self.session_dir = Path(session_dir or self.output_dir / "sessions")
+        self.session_ttl = session_ttl_hours * 3600
+        self.profile_cache = profile_cache
+        self.profile_cache_path = Path(profile_cache_path or self.output_dir / "profile_cache.sqlite3")
+        self.profile_cache_ttl = profile_cache_ttl_hours * 3600
+        # page snapshots and screenshots (artifacts.py); compression None picks zstd when installed
+        self.artifact_dir = Path(artifact_dir or self.output_dir / "snapshots")
+        self.html_snapshots = html_snapshots
+        self.screenshots = screenshots
+        self.artifact_sample_rate = artifact_sample_rate
+        self.html_compression = html_compression
+        self.screenshot_quality = screenshot_quality
+        self.artifact_max_bytes = int(artifact_max_mb * 1_000_000)
+        self.artifact_max_age = artifact_max_age_days * 86400
+        # requests aborted while scraping (resource_blocker.py), on top of its built-in lists
+        self.block_resources = block_resources
+        self.block_resource_types = list(block_resource_types)
+        self.block_domains = list(block_domains)
+        self.allow_domains = list(allow_domains)
+        self.block_third_party_scripts = block_third_party_scripts
+        # (min, max) seconds of jitter (pacing.py): delays by outcome, dwell on a profile, worker
+        # stagger; unset ones take pacing.py's defaults
+        self.pacing_delays = dict(pacing_delays or {})
+        self.page_dwell = page_dwell
+        self.pacing_stagger = pacing_stagger
+        # per-account token bucket (rate_limiter.py) and retries of failed profiles (retry_policy.py)
+        self.rate_limit_per_hour = rate_limit_per_hour
+        self.rate_limit_burst = rate_limit_burst
+        self.rate_limit_backoff_base = rate_limit_backoff_base
+        self.rate_limit_backoff_max = rate_limit_backoff_max
+        self.retry_max_attempts = retry_max_attempts
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_max = retry_backoff_max
+        # account rotation and health (accounts.py), cooldowns in seconds
+        self.accounts_file = Path(accounts_file)
+        self.account_health_window = account_health_window
+        self.account_max_error_rate = account_max_error_rate
+        self.account_max_consecutive_failures = account_max_consecutive_failures
+        self.account_cooldown = account_cooldown
+        self.account_challenge_cooldown = account_challenge_cooldown
+        # coordinator/worker mode (work_queue.py, distributed.py)
+        self.work_queue_url = work_queue_url or str(self.output_dir / "work_queue.sqlite3")
+        self.work_lease_seconds = work_lease_seconds
+        self.work_max_attempts = work_max_attempts
+
+    @classmethod
+    def from_env(cls, dotenv=True):
+        """Config from environment variables, after loading .env unless `dotenv` is False"""
+        if dotenv:
+            load_dotenv()
+        return cls(
+            email=os.getenv("LINKEDIN_EMAIL"),
+            password=os.getenv("LINKEDIN_PASSWORD"),
+            output_dir=os.getenv("OUTPUT_DIR", "output"),
+            output_format=os.getenv("OUTPUT_FORMAT", "csv"),
+            fsync_every=int(os.getenv("OUTPUT_FSYNC_EVERY", "10")),
+            workers=int(os.getenv("SCRAPER_WORKERS", "1")),
+            extract_mode=os.getenv("EXTRACT_MODE", "evaluate"),
+            headless=os.getenv("HEADLESS_MODE", "true").lower() == "true",
+            profile_wait_timeout=float(os.getenv("PROFILE_WAIT_TIMEOUT", "10")),
+            section_wait_timeout=float(os.getenv("SECTION_WAIT_TIMEOUT", "2")),
+            contact_wait_timeout=float(os.getenv("CONTACT_WAIT_TIMEOUT", "5")),
+            base_url=os.getenv("LINKEDIN_BASE_URL", DEFAULT_BASE_URL),
+            contact_info=os.getenv("CONTACT_INFO", "false").lower() == "true",
+            job_workers=int(os.getenv("JOB_WORKERS", "2")),
+            job_store_path=os.getenv("JOB_STORE_PATH"),
+            jobs_dir=os.getenv("JOBS_DIR"),
+            distributed=os.getenv("DISTRIBUTED", "false").lower() == "true",
+            browser_pool=os.getenv("BROWSER_POOL", "true").lower() == "true",
+            browser_pool_size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+            browser_pool_max_pages=int(os.getenv("BROWSER_POOL_MAX_PAGES", "200")),
+            session_cache=os.getenv("SESSION_CACHE", "true").lower() == "true",
+            session_dir=os.getenv("SESSION_DIR"),
+            session_ttl_hours=float(os.getenv("SESSION_TTL_HOURS", "12")),
+            profile_cache=os.getenv("PROFILE_CACHE", "true").lower() == "true",
+            profile_cache_path=os.getenv("PROFILE_CACHE_PATH"),
+            profile_cache_ttl_hours=float(os.getenv("PROFILE_CACHE_TTL_HOURS", "24")),
+            artifact_dir=os.getenv("ARTIFACT_DIR"),
+            html_snapshots=os.getenv("HTML_SNAPSHOTS", "always"),
+            screenshots=os.getenv("SCREENSHOTS", "on_error"),
+            artifact_sample_rate=float(os.getenv("ARTIFACT_SAMPLE_RATE", "0.1")),
+            html_compression=os.getenv("HTML_COMPRESSION"),
+            screenshot_quality=int(os.getenv("SCREENSHOT_QUALITY", "60")),
+            artifact_max_mb=float(os.getenv("ARTIFACT_MAX_MB", "1024")),
+            artifact_max_age_days=float(os.getenv("ARTIFACT_MAX_AGE_DAYS", "7")),
+            block_resources=os.getenv("BLOCK_RESOURCES", "true").lower() == "true",
+            block_resource_types=env_list("BLOCK_RESOURCE_TYPES", ("image", "font", "media")),
+            block_domains=env_list("BLOCK_DOMAINS"),
+            allow_domains=env_list("ALLOW_DOMAINS"),
+            block_third_party_scripts=os.getenv("BLOCK_THIRD_PARTY_SCRIPTS", "true").lower() == "true",
+            pacing_delays={
+                outcome: parse_range(os.getenv(f"PACING_{outcome.upper()}"))
+                for outcome in PACING_OUTCOMES if os.getenv(f"PACING_{outcome.upper()}")
+            },
+            page_dwell=parse_range(os.getenv("PAGE_DWELL")),
+            pacing_stagger=parse_range(os.getenv("PACING_STAGGER")),
+            rate_limit_per_hour=float(os.getenv("RATE_LIMIT_PER_HOUR", "300")),
+            rate_limit_burst=int(os.getenv("RATE_LIMIT_BURST", "3")),
+            rate_limit_backoff_base=float(os.getenv("RATE_LIMIT_BACKOFF_BASE", "30")),
+            rate_limit_backoff_max=float(os.getenv("RATE_LIMIT_BACKOFF_MAX", "600")),
+            retry_max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+            retry_backoff_base=float(os.getenv("RETRY_BACKOFF_BASE", "30")),
+            retry_backoff_max=float(os.getenv("RETRY_BACKOFF_MAX", "600")),
+            accounts_file=os.getenv("ACCOUNTS_FILE", "accounts.json"),
+            account_health_window=int(os.getenv("ACCOUNT_HEALTH_WINDOW", "20")),
+            account_max_error_rate=float(os.getenv("ACCOUNT_MAX_ERROR_RATE", "0.5")),
+            account_max_consecutive_failures=int(os.getenv("ACCOUNT_MAX_CONSECUTIVE_FAILURES", "5")),
+            account_cooldown=float(os.getenv("ACCOUNT_COOLDOWN", "1800")),
+            account_challenge_cooldown=float(os.getenv("ACCOUNT_CHALLENGE_COOLDOWN", "21600")),
+            work_queue_url=os.getenv("WORK_QUEUE_URL"),
+            work_lease_seconds=float(os.getenv("WORK_LEASE_SECONDS", "300")),
+            work_max_attempts=int(os.getenv("WORK_MAX_ATTEMPTS", "3")),
+        )
+
+    def require_credentials(self):
+        if not self.email or not self.password:
+            raise RuntimeError("Set LINKEDIN_EMAIL and LINKEDIN_PASSWORD in environment or .env")
+
+    def output_path(self, job_id, output_format=None):
+        """Default output file of a job"""
+        return self.output_dir / f"linkedin_profiles_{job_id}.{output_format or self.output_format}"
+
+
+def parse_range(value, default=None):
+    """Parse "min,max" (or a single number) into a (min, max) tuple"""
+    if not value:
+        return default
+    parts = [float(p) for p in value.split(",")]
+    return (parts[0], parts[-1])
+
+def env_list(name, default=()):
+    """Comma-separated environment variable as a list"""
+    value = os.getenv(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def load_dotenv():
+    """Load .env into the environment, if python-dotenv is installed"""
+    try:
+        from dotenv import load_dotenv as _load_dotenv
+    except ImportError:
+        return
+    _load_dotenv()
+
+
+_config = None
+_config_lock = threading.Lock()
+
+def get_config():
+    """Process-wide config, read from the environment on first call"""
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = ScraperConfig.from_env()
+    return _config
+
+def set_config(config):
+    """Replace the process-wide config, e.g. with one built in code instead of from the environment"""
+    global _config
+    with _config_lock:
+        _config = config
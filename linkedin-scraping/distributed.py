@@ -0,0 +1,204 @@
+"""Coordinator/worker mode: scale scraping out over several worker processes
+
+The coordinator (the web app with DISTRIBUTED=true) puts a job's URLs on a
+shared work queue (see work_queue.py) and merges the records that workers
+push back into the job's output file. Workers are stateless: each runs its
+own browser with its own LinkedIn account and claims URLs with a lease, so
+a URL held by a worker that dies is handed to another one.
+
+Usage: python distributed.py [--worker-id ID]
+"""
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+
+from config import get_config
+from metrics import PhaseTimings
+from scraper import (
+    BatchState, launch_browser, new_context, new_page, ensure_logged_in,
+    parse_profile_async, error_record,
+)
+from sinks import open_sink
+from checkpoint import JobManifest, new_job_id, DONE
+from session_cache import default_session_cache
+from resource_blocker import default_resource_blocker
+from artifacts import default_artifact_writer
+from pacing import Pacing
+from rate_limiter import limiter_for_job
+from profile_cache import default_profile_cache
+from url_normalizer import normalize_profile_urls
+from accounts import Account
+from work_queue import open_work_queue
+from retry_policy import RetryPolicy, classify_error, error_message, TRANSIENT, NOT_FOUND, AUTH_WALL
+
+
+POLL_INTERVAL = 1.0
+
+
+def scrape_distributed(profile_urls, status_callback=None, stop_check=None, output_format=None, job_id=None,
+                       queue=None, profile_cache=None, poll_interval=POLL_INTERVAL):
+    """Coordinator side of scrape_profiles: queue the URLs for workers and merge their results
+
+    Blocks until every URL has a result or a stop is requested, and returns
+    the output path. Takes the same status_callback/stop_check/job_id as
+    scrape_profiles; the job's manifest records which results were merged,
+    so calling it again with the same job_id after a restart carries on.
+    Once the results are merged (or the job is stopped) the job is purged
+    from the queue.
+    """
+    batch = normalize_profile_urls(profile_urls)
+    profile_urls = batch.urls
+    print(f"URLs: {batch.summary()}")
+
+    config = get_config()
+    job_id = job_id or new_job_id()
+    output_format = (output_format or config.output_format).lower()
+    manifest = JobManifest.open(job_id, profile_urls, config.output_path(job_id, output_format), output_format)
+    queue = queue or open_work_queue()
+    if profile_cache is None:
+        profile_cache = default_profile_cache()
+    sink = open_sink(manifest.output_path, fmt=manifest.output_format,
+                     fsync_every=config.fsync_every)
+    state = BatchState(profile_urls, sink, status_callback, stop_check, manifest=manifest, cache=profile_cache)
+    index = {url: idx for idx, url in enumerate(profile_urls, start=1)}
+    try:
+        for url in batch.rejected:
+            state.record_rejected(url, "Not a LinkedIn profile URL")
+
+        waiting = set()
+        for idx, url in enumerate(profile_urls, start=1):
+            if manifest.states.get(url) == DONE:
+                # merged before a restart
+                continue
+            rec = state.cached_record(url)
+            if rec is not None:
+                state.record_success(idx, rec, cached=True)
+            else:
+                waiting.add(url)
+        queue.enqueue(job_id, [url for url in profile_urls if url in waiting])
+        print(f"Job {job_id}: {len(waiting)} profiles queued for workers")
+        state.notify(state.total - len(waiting), state.total, f"Queued {len(waiting)} profiles for workers")
+
+        cursor = 0
+        while waiting:
+            if state.should_stop():
+                state.notify(state.total - len(waiting), state.total, "Stopped by user", str(sink.path))
+                break
+            records, cursor = queue.results(job_id, cursor)
+            for rec in records:
+                url = rec.get("profile_url")
+                # a URL whose lease expired can come back twice; the first result wins
+                if url not in waiting:
+                    continue
+                waiting.discard(url)
+                if rec.get("error"):
+                    state.record_failure(index[url], url, rec["error"])
+                else:
+                    state.record_success(index[url], rec)
+            if not records:
+                time.sleep(poll_interval)
+        # everything is in the output file now; the queue doesn't need to keep it
+        queue.purge(job_id)
+        return str(sink.path)
+    finally:
+        manifest.close()
+        sink.close()
+
+
+async def run_worker_node(queue, worker_id, stop_check=None, lease=None, max_attempts=None, idle_sleep=2.0):
+    """Claim URLs from `queue` and scrape them with this process's browser and account until stopped
+
+    URLs are leased for `lease` seconds (default WORK_LEASE_SECONDS) and
+    given up on after `max_attempts` (default WORK_MAX_ATTEMPTS). A URL
+    that lands on an auth wall goes back to the queue for other workers
+    and this one logs in again. Raises RuntimeError when it can't log in,
+    rather than failing every URL it would claim.
+    """
+    from playwright.async_api import async_playwright
+
+    config = get_config()
+    max_attempts = max_attempts or config.work_max_attempts
+    config.require_credentials()
+    account = Account(config.email, config.password)
+    pacing = Pacing.from_env()
+    retry_policy = RetryPolicy()
+    timings = PhaseTimings()
+    limiter = limiter_for_job(config.email)
+    artifacts = default_artifact_writer()
+    session_cache = default_session_cache(config.email)
+    async with async_playwright() as p:
+        browser = await launch_browser(p)
+        try:
+            storage_state = session_cache.load() if session_cache else None
+            context = await new_context(browser, storage_state=storage_state, blocker=default_resource_blocker())
+            page = await new_page(context)
+            await ensure_logged_in(page, session_cache, restored=storage_state is not None, account=account,
+                                   timings=timings)
+            print(f"Worker {worker_id} logged in, waiting for work")
+
+            while not (stop_check and stop_check()):
+                item = await asyncio.to_thread(queue.claim, worker_id, lease)
+                if item is None:
+                    await asyncio.sleep(idle_sleep)
+                    continue
+                if item.attempts > max_attempts:
+                    queue.fail(item, error_record(item.url, f"Gave up after {max_attempts} attempts"))
+                    continue
+                if not await limiter.acquire(stop_check):
+                    queue.fail(item, None, retry=True)
+                    break
+
+                print(f"[{worker_id}] Visiting {item.url} (job {item.job_id}, attempt {item.attempts})")
+                try:
+                    rec = await parse_profile_async(page, item.url, artifacts=artifacts, pacing=pacing, timings=timings)
+                    limiter.record(True)
+                    queue.complete(item, rec)
+                    outcome = "success"
+                except Exception as e:
+                    kind = classify_error(e)
+                    print(f"Error ({kind}) for {item.url}: {e}")
+                    if kind != NOT_FOUND:
+                        limiter.record(False)
+                    if kind == AUTH_WALL:
+                        # our session isn't trusted any more, not the profile's fault
+                        queue.fail(item, None, retry=True)
+                        print(f"Worker {worker_id} hit an auth wall, logging in again")
+                        if session_cache:
+                            session_cache.invalidate()
+                        await context.clear_cookies()
+                        await ensure_logged_in(page, session_cache, account=account, timings=timings)
+                        continue
+                    # the lease carries the attempt count; backoff comes from the limiter, not the policy's delay
+                    retry = item.attempts < max_attempts and retry_policy.retry_delay(kind, item.attempts) is not None
+                    queue.fail(item, error_record(item.url, error_message(kind, e)), retry=retry)
+                    outcome = "timeout" if kind == TRANSIENT else "error"
+                await asyncio.sleep(pacing.delay_after(outcome))
+        finally:
+            if artifacts:
+                await asyncio.to_thread(artifacts.flush)
+            print(f"Worker {worker_id} timings:\n{timings.report()}")
+            await browser.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a scraping worker that takes URLs from the shared work queue")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    parser.add_argument("--queue", default=None, help="work queue URL (default WORK_QUEUE_URL)")
+    args = parser.parse_args(argv)
+
+    queue = open_work_queue(args.queue)
+    try:
+        asyncio.run(run_worker_node(queue, args.worker_id))
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        print(f"Worker {args.worker_id} stopped: {e}")
+        return 1
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+// Reads every profile field in one page.evaluate round trip.
+// Selectors and fallbacks mirror scraper.extract_fields; like Playwright's
+// strict locators, a selector matching several elements reads as "".
+() => {
+    const clean = (el) => ((el.innerText || el.textContent || "")).trim();
+
+    const find = (roots, selector) => {
+        const found = [];
+        for (const root of roots) {
+            for (const el of root.querySelectorAll(selector)) {
+                if (!found.includes(el)) found.push(el);
+            }
+        }
+        return found;
+    };
+
+    const text = (roots, selector) => {
+        const found = find(roots, selector);
+        return found.length === 1 ? clean(found[0]) : "";
+    };
+
+    // equivalent of `section:has(#anchorId)`
+    const sectionsWith = (anchorId) =>
+        Array.from(document.querySelectorAll("section")).filter((s) => s.querySelector("#" + anchorId));
+
+    const page = [document];
+
+    // Name
+    let full_name = text(page, "div.ph5 h1") || text(page, "h1.text-heading-xlarge");
+    if (!full_name) full_name = text(page, "h1");
+
+    // Headline
+    let headline = text(page, "div.text-body-medium") || text(page, ".pv-top-card--list li");
+    if (!headline) headline = text(page, "div.ph5 div.text-body-medium");
+
+    // Location
+    let location = text(page, "span.text-body-small.inline.t-black--light.break-words");
+    if (!location) location = text(page, ".pv-top-card--list-bullet li");
+
+    // About
+    let about = "";
+    const aboutSection = sectionsWith("about");
+    if (aboutSection.length) about = text(aboutSection, ".inline-show-more-text");
+    if (!about) about = text(page, "section.pv-about-section p");
+
+    // Profile image URL
+    let img = find(page, "img.pv-top-card-profile-picture__image");
+    if (!img.length) img = find(page, "button.pv-top-card-profile-picture img");
+    if (!img.length) img = find(page, "img[title*='profile']");
+    const profile_image_url = img.length ? (img[0].getAttribute("src") || "") : "";
+
+    // Experience
+    const experiences = [];
+    const expSection = sectionsWith("experience");
+    if (expSection.length) {
+        for (const li of find(expSection, "ul li.artdeco-list__item").slice(0, 10)) {
+            const item = [li];
+            const title = text(item, "div.display-flex.align-items-center span[aria-hidden='true']")
+                || text(item, "span.mr1.t-bold span");
+            const company = text(item, "span.t-14.t-normal span[aria-hidden='true']")
+                || text(item, "span.t-14.t-normal");
+            const duration = text(item, "span.t-14.t-normal.t-black--light span[aria-hidden='true']")
+                || text(item, "span.pvs-entity__caption-wrapper");
+            if (title || company) experiences.push({ company, title, duration });
+        }
+    }
+    // Fallback
+    if (!experiences.length) {
+        for (const li of find(page, "section#experience-section li").slice(0, 10)) {
+            const item = [li];
+            const title = text(item, "h3");
+            const company = text(item, "p.pv-entity__secondary-title");
+            if (title || company) experiences.push({ company, title, duration: "" });
+        }
+    }
+
+    // Education
+    const educations = [];
+    const eduSection = sectionsWith("education");
+    if (eduSection.length) {
+        for (const li of find(eduSection, "ul li.artdeco-list__item").slice(0, 5)) {
+            const item = [li];
+            const school = text(item, "span.mr1.hoverable-link-text.t-bold span[aria-hidden='true']")
+                || text(item, "span.mr1.t-bold span");
+            const degree = text(item, "span.t-14.t-normal span[aria-hidden='true']")
+                || text(item, "span.t-14.t-normal");
+            if (school) educations.push({ school, degree });
+        }
+    }
+    // Fallback
+    if (!educations.length) {
+        for (const li of find(page, "#education-section li").slice(0, 5)) {
+            const item = [li];
+            const school = text(item, "h3");
+            const degree = text(item, ".pv-entity__degree-name");
+            if (school) educations.push({ school, degree });
+        }
+    }
+
+    return { full_name, headline, location, about, profile_image_url, experiences, educations };
+}
@@ -0,0 +1,316 @@
+import json
+import heapq
+import sqlite3
+import itertools
+import threading
+import traceback
+from pathlib import Path
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where the store isn't guarded against a second process
+    fcntl = None
+
+from config import get_config
+from checkpoint import new_job_id
+from progress import ProgressTracker
+
+
+# seconds between progress writes to the store while a job runs (see JobQueue._save_progress)
+JOB_SAVE_INTERVAL = 2.0
+# seconds between keep-alive comments on an idle event stream
+EVENT_HEARTBEAT = 15.0
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+STOPPED = "stopped"
+FAILED = "failed"
+FINISHED = (COMPLETED, STOPPED, FAILED)
+
+
+class Job:
+    """One /scrape request: its URLs and options plus the progress shown by /status/<id>
+
+    The job id doubles as the scraper's checkpoint id, so a job interrupted
+    by a restart resumes from its manifest.
+    """
+
+    def __init__(self, job_id, profile_urls, priority=0, options=None, created=None, status=None):
+        self.id = job_id
+        self.profile_urls = profile_urls
+        self.priority = priority
+        self.options = options or {}
+        self.created = created or datetime.now().isoformat()
+        status = dict({
+            'job_id': job_id,
+            'state': QUEUED,
+            'is_scraping': True,
+            'current_profile': 0,
+            'total_profiles': len(profile_urls),
+            'message': 'Queued',
+            'csv_path': None,
+            'stop_requested': False,
+            'has_successful_scrape': False,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'duplicates_removed': 0,
+            'rejected_urls': [],
+        }, **(status or {}))
+        status.pop('failures', None)
+        self.tracker = ProgressTracker(**status)
+        self.store = None
+        # tracker version last written to the store
+        self._saved_version = None
+
+    @property
+    def state(self):
+        return self.tracker.get('state')
+
+    def update_status(self, current, total, message, csv_path=None, has_success=False, failed_url=None,
+                      cache_hits=None, cache_misses=None, timings=None):
+        """status_callback for scrape_profiles; the job queue saves the progress, not this"""
+        changes = {'current_profile': current, 'total_profiles': total, 'message': message}
+        if csv_path:
+            changes['csv_path'] = csv_path
+        if has_success:
+            changes['has_successful_scrape'] = True
+        if cache_hits is not None:
+            changes['cache_hits'] = cache_hits
+            changes['cache_misses'] = cache_misses
+        if timings is not None:
+            changes['timings'] = timings
+        if failed_url:
+            self.tracker.add_failure(failed_url, **changes)
+        else:
+            self.tracker.update(**changes)
+
+    def check_stop(self):
+        return self.tracker.get('stop_requested')
+
+    def set_state(self, state, message=None, **changes):
+        if message:
+            changes['message'] = message
+        self.tracker.update(state=state, is_scraping=state not in FINISHED, **changes)
+        self.save()
+
+    def save(self):
+        if self.store:
+            self._saved_version = self.tracker.version
+            self.store.save_status(self)
+
+    def save_progress(self):
+        """Write the status to the store if it changed since the last write"""
+        if self.tracker.version != self._saved_version:
+            self.save()
+
+    def to_dict(self):
+        return dict(self.tracker.to_dict(), priority=self.priority, created=self.created)
+
+    def progress(self):
+        """The status fields that change while a job runs, without the URL lists"""
+        return {k: v for k, v in self.tracker.snapshot().items() if k != 'rejected_urls'}
+
+    def events(self, heartbeat=EVENT_HEARTBEAT):
+        """Yield (event, data) pairs for an event stream: a full snapshot, then only what changed
+
+        Progress updates that arrive while the reader is busy are coalesced
+        into one. Yields (None, None) after `heartbeat` idle seconds so the
+        caller can keep the connection open, and stops once the job finished.
+        """
+        if self.state in FINISHED:
+            yield 'done', self.to_dict()
+            return
+        seen = self.tracker.version
+        snapshot = self.to_dict()
+        yield 'snapshot', snapshot
+        failures_sent = len(snapshot['failed_urls'])
+        while self.state not in FINISHED:
+            version = self.tracker.wait(seen, timeout=heartbeat)
+            if version == seen:
+                yield None, None
+                continue
+            seen = version
+            new_failures = self.tracker.failures(failures_sent)
+            if new_failures:
+                yield 'failures', new_failures
+                failures_sent += len(new_failures)
+            yield 'progress', self.progress()
+        yield 'done', self.to_dict()
+
+
+class JobStore:
+    """Jobs persisted in SQLite so their state and results survive a restart
+
+    The store belongs to one process: the queue restores and resumes its
+    unfinished jobs, so a second process opening it (another worker of a
+    multi-process server) raises RuntimeError instead of scraping them twice.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or get_config().job_store_path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._owner = None
+        if fcntl is not None:
+            self._owner = open(self.path.with_name(self.path.name + ".lock"), "w")
+            try:
+                fcntl.flock(self._owner, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._owner.close()
+                raise RuntimeError(f"{self.path} is in use by another process; run the app as a single process")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " created TEXT NOT NULL,"
+            " priority INTEGER NOT NULL,"
+            " profile_urls TEXT NOT NULL,"
+            " options TEXT NOT NULL,"
+            " status TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def add(self, job):
+        """Store a new job; its URLs and options are written once, here"""
+        row = (job.id, job.created, job.priority, json.dumps(job.profile_urls), json.dumps(job.options),
+               json.dumps(job.tracker.to_dict()))
+        with self._lock:
+            self._db.execute("INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)", row)
+            self._db.commit()
+
+    def save_status(self, job):
+        status = json.dumps(job.tracker.to_dict())
+        with self._lock:
+            self._db.execute("UPDATE jobs SET status = ? WHERE id = ?", (status, job.id))
+            self._db.commit()
+
+    def load_all(self):
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, created, priority, profile_urls, options, status FROM jobs ORDER BY created"
+            ).fetchall()
+        return [
+            Job(job_id, json.loads(urls), priority, json.loads(options), created, json.loads(status))
+            for job_id, created, priority, urls, options, status in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+        if self._owner is not None:
+            # closing the file releases the lock
+            self._owner.close()
+
+
+class JobQueue:
+    """Priority queue of scrape jobs run by `workers` threads (default JOB_WORKERS)
+
+    `runner(job, resume)` scrapes a job and returns its output path;
+    `resume` is True for jobs that were running when the app stopped.
+    Higher priority jobs start first, FIFO within a priority. The progress
+    of running jobs is saved by a thread of its own, so the scraper's event
+    loop never waits on the store.
+    """
+
+    def __init__(self, runner, workers=None, store=None):
+        workers = workers or get_config().job_workers
+        self.runner = runner
+        self.store = store or JobStore()
+        self.jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stopped = threading.Event()
+        self._restore()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        self._threads.append(threading.Thread(target=self._save_progress, name="job-saver", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def _restore(self):
+        for job in self.store.load_all():
+            job.store = self.store
+            self.jobs[job.id] = job
+            if job.state not in FINISHED:
+                # a running job was cut short by a restart; its checkpoint lets it carry on
+                resume = job.state == RUNNING
+                heapq.heappush(self._heap, (-job.priority, next(self._seq), job.id, resume))
+
+    def submit(self, profile_urls, priority=0, status=None, **options):
+        job = Job(new_job_id(), profile_urls, priority, options, status=status)
+        job.store = self.store
+        self.store.add(job)
+        with self._cond:
+            self.jobs[job.id] = job
+            heapq.heappush(self._heap, (-priority, next(self._seq), job.id, False))
+            self._cond.notify()
+        return job
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return list(self.jobs.values())
+
+    def stop(self, job_id):
+        """Ask a job to stop; a queued job is cancelled. Returns False if it already finished"""
+        job = self.jobs.get(job_id)
+        if job is None or job.state in FINISHED:
+            return False
+        job.tracker.update(stop_requested=True)
+        with self._cond:
+            if job.state == QUEUED:
+                job.set_state(STOPPED, 'Cancelled before it started')
+        return True
+
+    def _next(self):
+        with self._cond:
+            while not self._closed:
+                while self._heap:
+                    _, _, job_id, resume = heapq.heappop(self._heap)
+                    job = self.jobs[job_id]
+                    if job.state in FINISHED:
+                        continue
+                    job.set_state(RUNNING, 'Starting scraper...')
+                    return job, resume
+                self._cond.wait()
+        return None, False
+
+    def _work(self):
+        while True:
+            job, resume = self._next()
+            if job is None:
+                return
+            try:
+                csv_path = self.runner(job, resume)
+                result = {'csv_path': str(csv_path)} if csv_path else {}
+                if job.check_stop():
+                    job.set_state(STOPPED, 'Scraping stopped by user!', **result)
+                else:
+                    job.set_state(COMPLETED, 'Scraping completed!', **result)
+            except Exception as e:
+                print(f"[ERROR] Job {job.id} failed with error: {e}")
+                traceback.print_exc()
+                job.set_state(FAILED, f'Error: {str(e)}')
+
+    def _save_progress(self):
+        while not self._stopped.wait(JOB_SAVE_INTERVAL):
+            for job in self.list():
+                if job.state == RUNNING:
+                    try:
+                        job.save_progress()
+                    except Exception as e:
+                        print(f"[ERROR] Could not save progress of job {job.id}: {e}")
+
+    def close(self):
+        self._stopped.set()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,120 @@
+import time
+import bisect
+import threading
+import contextlib
+
+
+# histogram bucket bounds, in seconds: from a fast locator call to a manual login
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+METRIC_NAME = "linkedin_scraper_phase_seconds"
+
+
+class Histogram:
+    """Cumulative count/sum and per-bucket counts of one phase's durations"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last slot counts observations above the highest bound (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+
+class MetricsRegistry:
+    """Process-wide duration histograms by phase, rendered in the Prometheus text format"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            histogram = self._histograms.get(phase)
+            if histogram is None:
+                histogram = self._histograms[phase] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def render(self):
+        """Exposition text for a /metrics endpoint"""
+        lines = [
+            f"# HELP {METRIC_NAME} Time spent in each phase of scraping.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for phase in sorted(self._histograms):
+                histogram = self._histograms[phase]
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    lines.append(f'{METRIC_NAME}_bucket{{phase="{phase}",le="{le}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{phase="{phase}"}} {histogram.sum:.6f}')
+                lines.append(f'{METRIC_NAME}_count{{phase="{phase}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class PhaseTimings:
+    """Time spent per phase of one job, also fed into the process-wide histograms
+
+    Wrap a step in `with timings.phase("goto"):`. The overhead is two
+    perf_counter calls and a dict update, small next to any page operation.
+    """
+
+    def __init__(self, registry=REGISTRY):
+        self.registry = registry
+        self._phases = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def stopwatch(self):
+        """Function that records the time since its previous call (or creation) under the name it is given
+
+        For timing consecutive steps without nesting each in a `with` block.
+        """
+        last = time.perf_counter()
+
+        def lap(name):
+            nonlocal last
+            now = time.perf_counter()
+            self.observe(name, now - last)
+            last = now
+        return lap
+
+    def observe(self, name, seconds):
+        with self._lock:
+            count, total, longest = self._phases.get(name, (0, 0.0, 0.0))
+            self._phases[name] = (count + 1, total + seconds, max(longest, seconds))
+        if self.registry is not None:
+            self.registry.observe(name, seconds)
+
+    def summary(self):
+        """{phase: {"count", "total", "mean", "max"}} in seconds, slowest phases first"""
+        with self._lock:
+            phases = dict(self._phases)
+        return {
+            name: {"count": count, "total": round(total, 3), "mean": round(total / count, 3), "max": round(longest, 3)}
+            for name, (count, total, longest) in sorted(phases.items(), key=lambda item: -item[1][1])
+        }
+
+    def report(self):
+        """One line per phase for the log"""
+        return "\n".join(
+            f"  {name:<14} n={s['count']:<5} total={s['total']:.1f}s mean={s['mean']:.3f}s max={s['max']:.3f}s"
+            for name, s in self.summary().items()
+        )
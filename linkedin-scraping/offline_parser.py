@@ -0,0 +1,194 @@
+"""Extract profile records from saved HTML snapshots, without a browser
+
+The selectors and fallbacks mirror scraper.extract_fields, so a snapshot
+gives the same fields as the live page. Contact info lives in a modal that
+is not part of the snapshot and is left empty.
+
+Usage: python offline_parser.py output/snapshots [-o output.csv] [--jobs N]
+"""
+import os
+import sys
+import argparse
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from lxml import html as lxml_html
+
+from records import build_record, parse_date_range
+from sinks import open_sink
+from artifacts import read_html
+
+
+def clean_text(element):
+    return " ".join(element.text_content().split())
+
+def find(roots, css):
+    """All elements under any of `roots` matching `css`, in document order, without duplicates"""
+    found = []
+    seen = set()
+    for root in roots:
+        for element in root.cssselect(css):
+            if element not in seen:
+                seen.add(element)
+                found.append(element)
+    return found
+
+def safe_text(roots, css):
+    # Playwright locators are strict, so several matches read as "" there too
+    found = find(roots, css)
+    if len(found) != 1:
+        return ""
+    return clean_text(found[0])
+
+def sections_with(doc, anchor_id):
+    """Equivalent of the `section:has(#anchor_id)` selector"""
+    return doc.xpath("//section[.//*[@id=$anchor_id]]", anchor_id=anchor_id)
+
+def extract_fields_html(html):
+    """Read the profile fields from a page's HTML"""
+    doc = lxml_html.fromstring(html)
+    page = [doc]
+
+    # Name:
+    full_name = safe_text(page, "div.ph5 h1") or safe_text(page, "h1.text-heading-xlarge")
+    if not full_name:
+        full_name = safe_text(page, "h1")
+
+    # Headline
+    headline = safe_text(page, "div.text-body-medium") or safe_text(page, ".pv-top-card--list li")
+    if not headline:
+        headline = safe_text(page, "div.ph5 div.text-body-medium")
+
+    # Location
+    location = safe_text(page, "span.text-body-small.inline.t-black--light.break-words")
+    if not location:
+        location = safe_text(page, ".pv-top-card--list-bullet li")
+
+    # About
+    about = ""
+    about_section = sections_with(doc, "about")
+    if about_section:
+        about = safe_text(about_section, ".inline-show-more-text")
+    if not about:
+        about = safe_text(page, "section.pv-about-section p")
+
+    # Profile image URL
+    img = find(page, "img.pv-top-card-profile-picture__image")
+    if not img:
+        img = find(page, "button.pv-top-card-profile-picture img")
+    if not img:
+        img = find(page, "img[title*='profile']")
+    profile_image_url = (img[0].get("src") or "") if img else ""
+
+    # Experience
+    experiences = []
+    exp_section = sections_with(doc, "experience")
+    if exp_section:
+        for item in find(exp_section, "ul li.artdeco-list__item")[:10]:
+            item = [item]
+            title = safe_text(item, "div.display-flex.align-items-center span[aria-hidden='true']")
+            if not title:
+                title = safe_text(item, "span.mr1.t-bold span")
+
+            company = safe_text(item, "span.t-14.t-normal span[aria-hidden='true']")
+            if not company:
+                company = safe_text(item, "span.t-14.t-normal")
+
+            duration = safe_text(item, "span.t-14.t-normal.t-black--light span[aria-hidden='true']")
+            if not duration:
+                duration = safe_text(item, "span.pvs-entity__caption-wrapper")
+
+            from_date, to_date = parse_date_range(duration)
+            if title or company:
+                experiences.append({"company": company, "title": title, "from": from_date, "to": to_date})
+
+    # Fallback
+    if not experiences:
+        for item in find(page, "section#experience-section li")[:10]:
+            item = [item]
+            title = safe_text(item, "h3")
+            company = safe_text(item, "p.pv-entity__secondary-title")
+            if title or company:
+                experiences.append({"company": company, "title": title, "from": "", "to": ""})
+
+    # Education
+    educations = []
+    edu_section = sections_with(doc, "education")
+    if edu_section:
+        for item in find(edu_section, "ul li.artdeco-list__item")[:5]:
+            item = [item]
+            school = safe_text(item, "span.mr1.hoverable-link-text.t-bold span[aria-hidden='true']")
+            if not school:
+                school = safe_text(item, "span.mr1.t-bold span")
+
+            degree = safe_text(item, "span.t-14.t-normal span[aria-hidden='true']")
+            if not degree:
+                degree = safe_text(item, "span.t-14.t-normal")
+
+            if school:
+                educations.append({"school": school, "degree": degree})
+
+    # Fallback
+    if not educations:
+        for item in find(page, "#education-section li")[:5]:
+            item = [item]
+            school = safe_text(item, "h3")
+            degree = safe_text(item, ".pv-entity__degree-name")
+            if school:
+                educations.append({"school": school, "degree": degree})
+
+    return {
+        "full_name": full_name,
+        "headline": headline,
+        "location": location,
+        "about": about,
+        "profile_image_url": profile_image_url,
+        "experiences": experiences,
+        "educations": educations,
+    }
+
+def parse_snapshot(path):
+    """Parse a `<slug>_<timestamp>.html[.gz|.zst]` snapshot written by the scraper into a record"""
+    path = Path(path)
+    name = path.name.split(".")[0]
+    slug, _, ts = name.rpartition("_")
+    if not slug:
+        slug, ts = name, ""
+    url = f"https://www.linkedin.com/in/{slug}/"
+    try:
+        record = build_record(url, extract_fields_html(read_html(path)))
+    except Exception as e:
+        return {"profile_url": url, "linkedin_id": slug, "error": f"Failed to parse {path.name}: {e}"}
+    try:
+        # the snapshot time is when the profile was actually scraped
+        record["scrape_date"] = datetime.strptime(ts, "%Y%m%dT%H%M%S").isoformat()
+    except ValueError:
+        pass
+    return record
+
+def find_snapshots(directory):
+    return sorted(p for p in Path(directory).iterdir() if p.name.endswith((".html", ".html.gz", ".html.zst")))
+
+def reparse_directory(directory, output_path, jobs=None, output_format=None):
+    """Reparse every snapshot in `directory` across `jobs` processes into one output file"""
+    snapshots = find_snapshots(directory)
+    with open_sink(output_path, fmt=output_format) as sink:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for record in executor.map(parse_snapshot, snapshots, chunksize=16):
+                sink.write(record)
+    return len(snapshots)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-extract profile records from saved HTML snapshots")
+    parser.add_argument("directory", help="directory with <slug>_<timestamp>.html[.gz|.zst] snapshots")
+    parser.add_argument("-o", "--output", default=None, help="output file (.csv or .jsonl)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="parser processes")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    args = parser.parse_args(argv)
+
+    output = args.output or f"reparsed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.format or 'csv'}"
+    count = reparse_directory(args.directory, output, jobs=args.jobs, output_format=args.format)
+    print(f"Parsed {count} snapshots into {output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import random
+
+from config import get_config, parse_range
+
+
+# (min, max) seconds to wait after a profile, by outcome, when nothing else spaces the visits out
+DEFAULT_DELAYS = {
+    "success": (5.0, 12.0),
+    "timeout": (3.0, 6.0),
+    "invalid": (2.0, 4.0),
+    "error": (3.0, 6.0),
+}
+# with the rate limiter on, its token bucket sets the pace and the delays are only jitter
+RATE_LIMITED_DELAYS = {
+    "success": (0.5, 2.0),
+    "timeout": (0.5, 1.5),
+    "invalid": (0.2, 0.5),
+    "error": (0.5, 1.5),
+}
+# (min, max) seconds to linger on a profile once it has rendered
+DEFAULT_DWELL = (0.5, 1.5)
+# (min, max) seconds between the starts of consecutive workers
+DEFAULT_STAGGER = (1.0, 3.0)
+
+
+class Pacing:
+    """Human-like jitter for the scraper, kept apart from the readiness waits
+
+    Page waits only detect when content is there; every deliberate delay
+    comes from here so the pacing rules are explicit and configurable.
+    """
+
+    def __init__(self, delays=None, dwell=None, stagger=None):
+        self.delays = dict(DEFAULT_DELAYS, **(delays or {}))
+        self.dwell = dwell if dwell is not None else DEFAULT_DWELL
+        self.stagger = stagger if stagger is not None else DEFAULT_STAGGER
+
+    @classmethod
+    def from_env(cls, rate_limited=None):
+        """Pacing from the PACING_* settings (see config.py)
+
+        Unset delays default to short jitter when the rate limiter is on
+        (`rate_limited`, default: RATE_LIMIT_PER_HOUR above 0) and to the
+        slower fixed delays when it is off.
+        """
+        config = get_config()
+        if rate_limited is None:
+            rate_limited = config.rate_limit_per_hour > 0
+        defaults = RATE_LIMITED_DELAYS if rate_limited else DEFAULT_DELAYS
+        return cls(delays=dict(defaults, **config.pacing_delays), dwell=config.page_dwell,
+                   stagger=config.pacing_stagger)
+
+    def delay_after(self, outcome):
+        """Seconds to wait before the next profile after one ended with `outcome`"""
+        low, high = self.delays.get(outcome, self.delays["error"])
+        return random.uniform(low, high)
+
+    def start_offset(self, worker_id):
+        """Stagger concurrent workers so they don't hit LinkedIn in one burst"""
+        low, high = self.stagger
+        return random.uniform(low, high) * worker_id
+
+    def dwell_time(self):
+        low, high = self.dwell
+        return random.uniform(low, high)
@@ -0,0 +1,88 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+from config import get_config
+
+
+# fields that change on every scrape and don't count as content
+VOLATILE_FIELDS = ("profile_url", "scrape_date")
+
+
+def content_hash(record):
+    content = {k: v for k, v in record.items() if k not in VOLATILE_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ProfileCache:
+    """Scraped records kept across runs, keyed by linkedin_id
+
+    Records younger than `ttl` seconds (default PROFILE_CACHE_TTL_HOURS) are
+    served instead of visiting the profile again. Each entry keeps a content hash so callers can tell
+    whether a re-scrape actually changed anything.
+    """
+
+    def __init__(self, path=None, ttl=None):
+        config = get_config()
+        self.path = Path(path or config.profile_cache_path)
+        self.ttl = config.profile_cache_ttl if ttl is None else ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS profiles ("
+            " linkedin_id TEXT PRIMARY KEY,"
+            " scraped_at REAL NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " record TEXT NOT NULL)"
+        )
+        self._db.commit()
+
+    def get(self, linkedin_id, ttl=None):
+        """Return the cached record if it is younger than `ttl` (default self.ttl), else None"""
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM profiles WHERE linkedin_id = ? AND scraped_at >= ?",
+                (linkedin_id, time.time() - ttl),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, record):
+        """Store a successfully scraped record; returns True if its content changed"""
+        if record.get("error") or not record.get("linkedin_id"):
+            return False
+        digest = content_hash(record)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash FROM profiles WHERE linkedin_id = ?", (record["linkedin_id"],)
+            ).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO profiles (linkedin_id, scraped_at, content_hash, record) VALUES (?, ?, ?, ?)",
+                (record["linkedin_id"], time.time(), digest, json.dumps(record, ensure_ascii=False)),
+            )
+            self._db.commit()
+        return row is None or row[0] != digest
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def default_profile_cache():
+    """Process-wide cache, or None when disabled with PROFILE_CACHE=false"""
+    global _default_cache
+    if not get_config().profile_cache:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ProfileCache()
+    return _default_cache
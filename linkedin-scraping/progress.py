@@ -0,0 +1,69 @@
+import threading
+from types import MappingProxyType
+
+
+class ProgressTracker:
+    """Status of a running job, written by the scraper thread and read by request threads
+
+    Writers are serialized by a lock and publish a fresh read-only mapping
+    of the fields on every change, so readers of the fields never lock:
+    snapshot() just returns the current mapping, which is always consistent.
+    Failed URLs are kept in an append-only list with a set for O(1)
+    duplicate checks; `failures` in the snapshot is their count. to_dict(),
+    which adds the list, takes the lock so the two match.
+    """
+
+    def __init__(self, failed_urls=(), **fields):
+        self._changed = threading.Condition()
+        self._failed = []
+        self._failed_index = set()
+        for url in failed_urls:
+            if url not in self._failed_index:
+                self._failed_index.add(url)
+                self._failed.append(url)
+        self._fields = MappingProxyType(dict(fields, failures=len(self._failed)))
+        # bumped on every change; see wait()
+        self.version = 0
+
+    def _publish(self, changes):
+        fields = dict(self._fields)
+        fields.update(changes)
+        self._fields = MappingProxyType(fields)
+        self.version += 1
+        self._changed.notify_all()
+
+    def update(self, **changes):
+        with self._changed:
+            self._publish(changes)
+
+    def add_failure(self, url, **changes):
+        """Record a failed URL (once) along with any other field changes"""
+        with self._changed:
+            if url not in self._failed_index:
+                self._failed_index.add(url)
+                self._failed.append(url)
+                changes['failures'] = len(self._failed)
+            self._publish(changes)
+
+    def get(self, field, default=None):
+        return self._fields.get(field, default)
+
+    def snapshot(self):
+        """Read-only view of the fields as of the last change"""
+        return self._fields
+
+    def failures(self, start=0):
+        """Failed URLs from position `start` on, in the order they failed"""
+        # the list only grows, so slicing up to a length read once is safe without the lock
+        return self._failed[start:len(self._failed)]
+
+    def to_dict(self):
+        """The fields plus the failed URLs, taken under the lock so `failures` matches the list"""
+        with self._changed:
+            return dict(self._fields, failed_urls=list(self._failed))
+
+    def wait(self, seen, timeout=None):
+        """Block until the version differs from `seen` or `timeout` passes; returns the version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != seen, timeout=timeout)
+            return self.version
@@ -0,0 +1,123 @@
+import time
+import random
+import asyncio
+import threading
+
+from config import get_config
+
+
+class TokenBucket:
+    """Profiles-per-hour budget with a burst allowance and backoff after errors
+
+    Thread-safe, since account buckets are shared by jobs running on
+    different threads or event loops. Unset arguments default to the
+    RATE_LIMIT_* settings (see config.py).
+    """
+
+    def __init__(self, profiles_per_hour=None, burst=None, backoff_base=None, backoff_max=None):
+        config = get_config()
+        profiles_per_hour = profiles_per_hour or config.rate_limit_per_hour
+        if not profiles_per_hour > 0:
+            # such a bucket would never refill, and every acquire() would wait forever
+            raise ValueError(f"profiles_per_hour must be positive, got {profiles_per_hour}")
+        self.rate = profiles_per_hour / 3600.0
+        self.capacity = max(1, int(burst or config.rate_limit_burst))
+        self.backoff_base = backoff_base or config.rate_limit_backoff_base
+        self.backoff_max = backoff_max or config.rate_limit_backoff_max
+        self.tokens = float(self.capacity)
+        self.failures = 0
+        self.backoff_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self):
+        """Seconds until a token can be taken"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            backoff = max(0.0, self.backoff_until - now)
+            if self.tokens >= 1:
+                return backoff
+            return max(backoff, (1 - self.tokens) / self.rate)
+
+    def try_take(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.tokens >= 1 and now >= self.backoff_until:
+                self.tokens -= 1
+                return True
+            return False
+
+    def give_back(self):
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    def record(self, ok):
+        """Reset the backoff after a success, grow it exponentially with consecutive errors"""
+        with self._lock:
+            if ok:
+                self.failures = 0
+                return
+            self.failures += 1
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (self.failures - 1))
+            self.backoff_until = time.monotonic() + delay * random.uniform(0.8, 1.2)
+
+
+class RateLimiter:
+    """Takes a token from every bucket (account ceiling, optional job budget) before each profile"""
+
+    def __init__(self, *buckets):
+        self.buckets = [b for b in buckets if b is not None]
+
+    async def acquire(self, stop_check=None):
+        """Wait for a token, returning False if a stop was requested meanwhile"""
+        while True:
+            if stop_check and stop_check():
+                return False
+            wait = max((b.wait_time() for b in self.buckets), default=0)
+            if wait <= 0:
+                taken = []
+                for bucket in self.buckets:
+                    if not bucket.try_take():
+                        break
+                    taken.append(bucket)
+                else:
+                    return True
+                # another worker got there first, return what we took
+                for bucket in taken:
+                    bucket.give_back()
+                wait = 0.05
+            await asyncio.sleep(min(wait, 0.5))
+
+    def record(self, ok):
+        for bucket in self.buckets:
+            bucket.record(ok)
+
+
+_account_buckets = {}
+_account_buckets_lock = threading.Lock()
+
+def account_bucket(account):
+    """The bucket shared by every job scraping with `account`, or None with RATE_LIMIT_PER_HOUR=0"""
+    if get_config().rate_limit_per_hour <= 0:
+        return None
+    with _account_buckets_lock:
+        if account not in _account_buckets:
+            _account_buckets[account] = TokenBucket()
+        return _account_buckets[account]
+
+def limiters_for_job(accounts, profiles_per_hour=None, burst=None):
+    """Limiters for one job scraping with several accounts: each account's ceiling plus one shared job budget"""
+    job_bucket = None
+    if profiles_per_hour:
+        job_bucket = TokenBucket(float(profiles_per_hour), burst)
+    return {account: RateLimiter(account_bucket(account), job_bucket) for account in accounts}
+
+def limiter_for_job(account, profiles_per_hour=None, burst=None):
+    """Limiter for one job: the account's ceiling plus the job's own budget, if given"""
+    return limiters_for_job([account], profiles_per_hour, burst)[account]
@@ -0,0 +1,70 @@
+import json
+from datetime import datetime
+
+
+def profile_slug(url):
+    # extracting the linkedin id from the url
+    return url.rstrip("/").split("/")[-1]
+
+def split_name(full_name):
+    """Split a full name into first name and the rest"""
+    first_name = ""
+    last_name = ""
+    if full_name:
+        parts = full_name.split()
+        if len(parts) > 0:
+            first_name = parts[0]
+        if len(parts) > 1:
+            last_name = " ".join(parts[1:])
+    return first_name, last_name
+
+def parse_date_range(duration):
+    """Turn 'Jan 2020 - Present · 4 yrs' style captions into (from, to)"""
+    from_date = ""
+    to_date = ""
+    if duration and " - " in duration:
+        parts = duration.split(" - ")
+        from_date = parts[0].strip()
+        to_date = parts[1].strip() if len(parts) > 1 else "Present"
+    return from_date, to_date
+
+def format_contact_info(contact_info):
+    contact_info_str = ""
+    if contact_info:
+        parts = []
+        if 'email' in contact_info:
+            parts.append(f"Email: {contact_info['email']}")
+        if 'phone' in contact_info:
+            parts.append(f"Phone: {contact_info['phone']}")
+        contact_info_str = " | ".join(parts)
+    return contact_info_str
+
+def build_record(url, fields, contact_info=None):
+    """Assemble the output record from extracted profile fields
+
+    `fields` holds full_name, headline, location, about, profile_image_url,
+    experiences and educations, as produced by any of the extractors.
+    """
+    full_name = fields.get("full_name", "")
+    first_name, last_name = split_name(full_name)
+    experiences = fields.get("experiences", [])
+    current = experiences[0] if experiences else {}
+
+    # Collected data
+    return {
+        "profile_url": url,
+        "scrape_date": datetime.now().isoformat(),
+        "linkedin_id": profile_slug(url),
+        "full_name": full_name,
+        "first_name": first_name,
+        "last_name": last_name,
+        "headline": fields.get("headline", ""),
+        "current_company": current.get("company", ""),
+        "current_title": current.get("title", ""),
+        "location": fields.get("location", ""),
+        "about": fields.get("about", ""),
+        "experience": json.dumps(experiences, ensure_ascii=False),
+        "education": json.dumps(fields.get("educations", []), ensure_ascii=False),
+        "profile_image_url": fields.get("profile_image_url", ""),
+        "contact_info": format_contact_info(contact_info),
+    }
@@ -0,0 +1,107 @@
+import random
+from urllib.parse import urlsplit
+
+from config import get_config
+from accounts import is_challenge_url
+
+
+# kinds of scrape failures
+TRANSIENT = "transient"
+NOT_FOUND = "not_found"
+AUTH_WALL = "auth_wall"
+RATE_LIMITED = "rate_limited"
+PARSE_FAILURE = "parse_failure"
+INVALID = "invalid"
+
+# attempts per profile before giving up, by kind; 1 means no retry.
+# Transient and rate limited failures get RETRY_MAX_ATTEMPTS (see config.py);
+# an auth wall is tried once more after logging in again.
+DEFAULT_MAX_ATTEMPTS = {
+    PARSE_FAILURE: 2,
+    AUTH_WALL: 2,
+    NOT_FOUND: 1,
+    INVALID: 1,
+}
+
+# HTTP statuses LinkedIn answers with when it throttles (999 is its own)
+RATE_LIMIT_STATUSES = (429, 999)
+NOT_FOUND_STATUSES = (404, 410)
+# markers in Playwright network error messages
+NETWORK_ERROR_MARKERS = ("net::ERR_", "NS_ERROR_", "Target closed", "Navigation failed because page crashed")
+
+
+class ScrapeError(Exception):
+    """A profile visit that failed in a known way; `kind` is one of the kinds above"""
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+
+def check_response(url, response, page_url):
+    """Raise ScrapeError if navigating to `url` didn't land on the profile"""
+    status = response.status if response is not None else None
+    if status in RATE_LIMIT_STATUSES:
+        raise ScrapeError(RATE_LIMITED, f"LinkedIn answered {status} (rate limited)")
+    if status in NOT_FOUND_STATUSES or urlsplit(page_url or "").path.rstrip("/") == "/404":
+        raise ScrapeError(NOT_FOUND, "Profile not found")
+    if is_challenge_url(page_url):
+        raise ScrapeError(AUTH_WALL, "Redirected to LinkedIn login/verification")
+
+
+def _playwright_errors():
+    """Playwright's (Error, TimeoutError), imported only when classifying; empty without Playwright"""
+    try:
+        from playwright.async_api import Error, TimeoutError
+    except ImportError:
+        return (), ()
+    return Error, TimeoutError
+
+
+def classify_error(exc):
+    """Kind of failure `exc` stands for
+
+    Only a ScrapeError says a URL is INVALID; other errors raised while
+    extracting (a ValueError from bad JSON or a number that didn't parse)
+    are parse failures and get retried.
+    """
+    PWError, PWTimeoutError = _playwright_errors()
+    if isinstance(exc, ScrapeError):
+        return exc.kind
+    if isinstance(exc, PWTimeoutError):
+        return TRANSIENT
+    if isinstance(exc, PWError) and any(marker in str(exc) for marker in NETWORK_ERROR_MARKERS):
+        return TRANSIENT
+    return PARSE_FAILURE
+
+
+def error_message(kind, exc):
+    """Text for the error column of a profile that failed for good"""
+    if kind == TRANSIENT and isinstance(exc, _playwright_errors()[1]):
+        return "Timeout accessing profile"
+    if kind in (INVALID, NOT_FOUND, AUTH_WALL, RATE_LIMITED):
+        return str(exc)
+    return f"Failed to scrape: {str(exc)}"
+
+
+class RetryPolicy:
+    """Which failures are retried, how often and after how long
+
+    The delay grows exponentially with the attempt number, capped at
+    `backoff_max` and jittered so retries of one batch don't line up.
+    """
+
+    def __init__(self, max_attempts=None, backoff_base=None, backoff_max=None):
+        config = get_config()
+        self.max_attempts = dict(DEFAULT_MAX_ATTEMPTS)
+        self.max_attempts.update({TRANSIENT: config.retry_max_attempts, RATE_LIMITED: config.retry_max_attempts})
+        self.max_attempts.update(max_attempts or {})
+        self.backoff_base = backoff_base or config.retry_backoff_base
+        self.backoff_max = backoff_max or config.retry_backoff_max
+
+    def retry_delay(self, kind, attempt):
+        """Seconds to wait before retrying after failed attempt number `attempt`, or None to give up"""
+        if attempt >= self.max_attempts.get(kind, 1):
+            return None
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * random.uniform(0.8, 1.2)
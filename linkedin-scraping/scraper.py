@@ -1,181 +1,325 @@
 
-import os
-import time
-import csv
-import json
-import random
+import sys
+import asyncio
+import collections
+import contextlib
+import heapq
 from pathlib import Path
 from datetime import datetime
-from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeoutError
+from config import get_config
+from metrics import PhaseTimings
+from sinks import open_sink
+from session_cache import session_is_valid
+from records import profile_slug, parse_date_range, build_record, format_contact_info
+from resource_blocker import default_resource_blocker
+from artifacts import default_artifact_writer
+from pacing import Pacing
+from rate_limiter import RateLimiter, limiters_for_job
+from checkpoint import JobManifest, new_job_id, DONE, FAILED
+from profile_cache import default_profile_cache
+from url_normalizer import normalize_profile_urls, canonical_profile_url
+from accounts import default_account_pool, SUCCESS, TIMEOUT, ERROR, CHALLENGE
+from retry_policy import (
+    RetryPolicy, ScrapeError, check_response, classify_error, error_message,
+    TRANSIENT, NOT_FOUND, AUTH_WALL, PARSE_FAILURE, INVALID,
+)
 
 
-load_dotenv()
-EMAIL = os.getenv("LINKEDIN_EMAIL")
-PASSWORD = os.getenv("LINKEDIN_PASSWORD")
+# Importing this module has no side effects: settings come from get_config()
+# (see config.py) and Playwright is only imported once a browser is needed.
 
-if not EMAIL or not PASSWORD:
-    raise SystemExit("Set LINKEDIN_EMAIL and LINKEDIN_PASSWORD in environment or .env")
+# rendered once the profile's top card is on the page
+TOP_CARD_SELECTOR = "div.ph5 h1, h1.text-heading-xlarge, main h1"
+# anchors of the lazily loaded profile sections
+SECTIONS_SELECTOR = "#experience, #education, #about, #experience-section, #education-section"
+CONTACT_MODAL_SELECTOR = "section.pv-contact-info__contact-type, div[role='dialog']"
+# a profile URL plus this opens the profile with its contact info modal already showing
+CONTACT_OVERLAY_PATH = "overlay/contact-info/"
+# logins tried before an account is taken out of rotation for a verification challenge
+LOGIN_ATTEMPTS = 2
 
+# in-page script for the single round trip "evaluate" extraction mode, read on first use
+EXTRACT_PROFILE_JS_PATH = Path(__file__).parent / "extract_profile.js"
+_extract_profile_js = None
 
-OUTPUT_DIR = Path("output")
-OUTPUT_DIR.mkdir(exist_ok=True)
+def extract_profile_js():
+    global _extract_profile_js
+    if _extract_profile_js is None:
+        _extract_profile_js = EXTRACT_PROFILE_JS_PATH.read_text(encoding="utf-8")
+    return _extract_profile_js
 
-def safe_text(locator):
+async def safe_text(locator):
     try:
-        return locator.inner_text(timeout=3000).strip()
+        return (await locator.inner_text(timeout=3000)).strip()
     except Exception:
         try:
-            return locator.text_content(timeout=3000).strip()
+            return ((await locator.text_content(timeout=3000)) or "").strip()
         except Exception:
             return ""
 
-def safe_attr(locator, attr):
+async def safe_attr(locator, attr):
     try:
-        return locator.get_attribute(attr, timeout=3000) or ""
+        return (await locator.get_attribute(attr, timeout=3000)) or ""
     except Exception:
         return ""
 
-def login_linkedin(page):
-    page.goto("https://www.linkedin.com/login", wait_until="networkidle")
+async def login_linkedin_async(page, account=None, timings=None):
+    """Log in with `account` (default: the configured LINKEDIN_EMAIL/PASSWORD), returning True once the session is authenticated"""
+    timings = timings or PhaseTimings()
+    with timings.phase("login"):
+        return await _login(page, account, timings)
+
+async def _login(page, account, timings):
+    from playwright.async_api import TimeoutError as PWTimeoutError
+
+    config = get_config()
+    if account is None:
+        config.require_credentials()
+        email, password = config.email, config.password
+    else:
+        email, password = account.email, account.password
+    if not password:
+        print(f"No password for {email} and its saved session is gone, can't log in.")
+        return False
+    await page.goto(f"{config.base_url}/login", wait_until="networkidle")
     # logging in
-    page.fill('input#username', EMAIL)
-    page.fill('input#password', PASSWORD)
-    page.click('button[type="submit"]')
+    await page.fill('input#username', email)
+    await page.fill('input#password', password)
+    await page.click('button[type="submit"]')
     # waiting some time to make sure the site loads
     try:
-        page.wait_for_url("https://www.linkedin.com/feed/*", timeout=15000)
-        print("Logged in automatically.")
+        await page.wait_for_url(f"{config.base_url}/feed/*", timeout=15000)
+        print(f"Logged in automatically as {email}.")
     except PWTimeoutError:
         print("Login did not complete automatically. If LinkedIn asked for verification (MFA/CAPTCHA), please complete it in the opened browser.")
         # give human 2 minutes to solve verification (adjust as needed)
-        page.wait_for_timeout(120_000)
+        await page.wait_for_timeout(120_000)
         
         print("Resuming after manual intervention.")
+    with timings.phase("session_check"):
+        return await session_is_valid(page.context)
 
-def parse_profile(page, url):
-    # visiting the url
-    page.goto(url, wait_until="domcontentloaded")
-    # again waiting some time to make sure data is loaded
-    time.sleep(random.uniform(2.0, 4.0))
+async def ensure_logged_in(page, session_cache=None, restored=False, account=None, timings=None):
+    """Reuse a restored session if it is still valid, otherwise log in and cache the new one
 
-    # extracting the linkedin id from the url
-    slug = url.rstrip("/").split("/")[-1]
-    
-    ts = datetime.now().strftime("%Y%m%dT%H%M%S")
-    screenshot_path = OUTPUT_DIR / f"{slug}_{ts}.png"
-    html_path = OUTPUT_DIR / f"{slug}_{ts}.html"
-    
+    `restored` tells whether the page's context was created from a saved
+    storage state. Returns True when that session was reused. A login that
+    doesn't go through is tried again, up to LOGIN_ATTEMPTS times; with an
+    `account`, failing all of them counts as a verification challenge
+    against it and raises RuntimeError. Login steps are timed into `timings`
+    (see metrics.py).
+    """
+    timings = timings or PhaseTimings()
+    context = page.context
+    if restored:
+        with timings.phase("session_check"):
+            valid = await session_is_valid(context)
+        if valid:
+            print("Reusing saved LinkedIn session.")
+            return True
+        # expired server side, start from a clean slate
+        if session_cache:
+            session_cache.invalidate()
+        await context.clear_cookies()
+
+    for attempt in range(LOGIN_ATTEMPTS):
+        if attempt:
+            print("Login did not go through, trying once more.")
+            await context.clear_cookies()
+        logged_in = await login_linkedin_async(page, account, timings)
+        if logged_in:
+            break
+    if session_cache and logged_in:
+        session_cache.save(await context.storage_state())
+    if account and not logged_in:
+        account.record(CHALLENGE)
+        raise RuntimeError(f"Could not log in as {account.email}")
+    return False
+
+async def wait_for_profile(page):
+    """Wait until the top card has rendered and the sections have started to load
+
+    Each step is capped (PROFILE_WAIT_TIMEOUT, SECTION_WAIT_TIMEOUT), so a
+    page that never renders a profile is extracted as-is rather than
+    failing. Returns False if the top card never showed up.
+    """
+    from playwright.async_api import TimeoutError as PWTimeoutError
+
+    config = get_config()
     try:
-        page.screenshot(path=str(screenshot_path), full_page=True)
-    except Exception:
+        await page.wait_for_selector(TOP_CARD_SELECTOR, state="attached", timeout=config.profile_wait_timeout)
+    except PWTimeoutError:
+        return False
+    try:
+        await page.wait_for_selector(SECTIONS_SELECTOR, state="attached", timeout=config.section_wait_timeout)
+    except PWTimeoutError:
+        # profile without any of these sections
         pass
+    return True
+
+async def parse_profile_async(page, url, extract_mode=None, artifacts=None, pacing=None, timings=None):
+    """Visit a profile and extract its record
+
+    `extract_mode` (default EXTRACT_MODE) picks how fields are read:
+    "evaluate" reads them all in one in-page script call, "locators" queries
+    the live page field by field, "html" parses the page's HTML with
+    offline_parser in a worker thread, leaving the event loop free.
+    Snapshots and screenshots are saved through `artifacts` (see
+    artifacts.py) when its policy asks for them. `pacing` adds the
+    human-like dwell time once the page has rendered. Each step is timed
+    into `timings` (see metrics.py). Contact info is left empty; it takes a
+    second visit (see enrich_contact_info).
+    """
+    timings = timings or PhaseTimings()
+    # visiting the url
+    with timings.phase("goto"):
+        response = await page.goto(url, wait_until="domcontentloaded")
+    check_response(url, response, page.url)
+    # waiting for the data itself rather than a fixed time
+    with timings.phase("wait_render"):
+        rendered = await wait_for_profile(page)
+    if not rendered:
+        # a late redirect to the authwall, or a page that isn't a profile
+        check_response(url, None, page.url)
+    if pacing:
+        with timings.phase("dwell"):
+            await asyncio.sleep(pacing.dwell_time())
+
+    slug = profile_slug(url)
+    html = None
     
-    try:
-        html = page.content()
-        html_path.write_text(html, encoding="utf-8")
-    except Exception:
-        html = ""
+    extract_mode = extract_mode or get_config().extract_mode
+    with timings.phase("extract"):
+        if extract_mode == "html":
+            from offline_parser import extract_fields_html
+            with timings.phase("page_content"):
+                html = await page.content()
+            fields = await asyncio.to_thread(extract_fields_html, html)
+        elif extract_mode == "locators":
+            fields = await extract_fields(page, timings)
+        else:
+            fields = await extract_fields_evaluate(page)
+
+    if artifacts:
+        # a profile without a name most likely didn't render properly
+        with timings.phase("artifacts"):
+            await artifacts.capture(page, slug, failed=not fields.get("full_name"), html=html)
+    if not rendered and not fields.get("full_name"):
+        raise ScrapeError(PARSE_FAILURE, "Profile did not render")
 
+    return build_record(url, fields)
+
+async def enrich_contact_info(page, rec, timings=None):
+    """Open a scraped profile's contact info overlay and return `rec` with what it shows
+
+    The overlay has a URL of its own, so the modal is loaded directly rather
+    than by waiting for the profile to render and clicking through to it.
+    """
+    timings = timings or PhaseTimings()
+    url = rec["profile_url"]
+    overlay_url = url.rstrip("/") + "/" + CONTACT_OVERLAY_PATH
+    with timings.phase("contact_info"):
+        response = await page.goto(overlay_url, wait_until="domcontentloaded")
+        check_response(url, response, page.url)
+        contact_info = await fetch_contact_info(page)
+    return dict(rec, contact_info=format_contact_info(contact_info))
+
+async def extract_fields_evaluate(page):
+    """Read the profile fields in one IPC call by running extract_profile.js in the page"""
+    fields = await page.evaluate(extract_profile_js())
+    for exp in fields["experiences"]:
+        exp["from"], exp["to"] = parse_date_range(exp.pop("duration", ""))
+    return fields
+
+async def extract_fields(page, timings=None):
+    """Read the profile fields from the live page with Playwright locators, timing each section"""
+    lap = (timings or PhaseTimings()).stopwatch()
     # Name:
     full_name = ""
     try:
-        full_name = safe_text(page.locator("div.ph5 h1")) or safe_text(page.locator("h1.text-heading-xlarge"))
+        full_name = await safe_text(page.locator("div.ph5 h1")) or await safe_text(page.locator("h1.text-heading-xlarge"))
         if not full_name:
-            full_name = safe_text(page.locator("h1"))
+            full_name = await safe_text(page.locator("h1"))
     except Exception:
         pass
 
-    # splitting name into first and last
-    first_name = ""
-    last_name = ""
-    if full_name:
-        parts = full_name.split()
-        if len(parts) > 0:
-            first_name = parts[0]
-        if len(parts) > 1:
-            last_name = " ".join(parts[1:])
-
     # Headline 
     headline = ""
     try:
-        headline = safe_text(page.locator("div.text-body-medium")) or safe_text(page.locator(".pv-top-card--list li"))
+        headline = await safe_text(page.locator("div.text-body-medium")) or await safe_text(page.locator(".pv-top-card--list li"))
         if not headline:
-            headline = safe_text(page.locator("div.ph5 div.text-body-medium"))
+            headline = await safe_text(page.locator("div.ph5 div.text-body-medium"))
     except Exception:
         pass
 
     # Location
     location = ""
     try:
-        location = safe_text(page.locator("span.text-body-small.inline.t-black--light.break-words"))
+        location = await safe_text(page.locator("span.text-body-small.inline.t-black--light.break-words"))
         if not location:
-            location = safe_text(page.locator(".pv-top-card--list-bullet li"))
+            location = await safe_text(page.locator(".pv-top-card--list-bullet li"))
     except Exception:
         pass
 
+    lap("section_top_card")
+
     # About
     about = ""
     try:
         about_section = page.locator("section:has(#about)")
-        if about_section.count() > 0:
-            about = safe_text(about_section.locator(".inline-show-more-text"))
+        if (await about_section.count()) > 0:
+            about = await safe_text(about_section.locator(".inline-show-more-text"))
         if not about:
-            about = safe_text(page.locator("section.pv-about-section p"))
+            about = await safe_text(page.locator("section.pv-about-section p"))
     except Exception:
         pass
 
+    lap("section_about")
+
     # Profile image URL
     profile_image_url = ""
     try:
         img = page.locator("img.pv-top-card-profile-picture__image")
-        if img.count() == 0:
+        if (await img.count()) == 0:
             img = page.locator("button.pv-top-card-profile-picture img")
-        if img.count() == 0:
+        if (await img.count()) == 0:
             img = page.locator("img[title*='profile']")
-        profile_image_url = safe_attr(img.first, "src")
+        profile_image_url = await safe_attr(img.first, "src")
     except Exception:
         pass
 
+    lap("section_image")
+
     # Experience
     experiences = []
-    current_company = ""
-    current_title = ""
     
     try:
         #
         exp_section = page.locator("section:has(#experience)")
-        if exp_section.count() > 0:
+        if (await exp_section.count()) > 0:
             exp_items = exp_section.locator("ul li.artdeco-list__item")
-            count = min(exp_items.count(), 10)
+            count = min(await exp_items.count(), 10)
             
             for i in range(count):
                 item = exp_items.nth(i)
                 
                 # job title
-                title = safe_text(item.locator("div.display-flex.align-items-center span[aria-hidden='true']"))
+                title = await safe_text(item.locator("div.display-flex.align-items-center span[aria-hidden='true']"))
                 if not title:
-                    title = safe_text(item.locator("span.mr1.t-bold span"))
+                    title = await safe_text(item.locator("span.mr1.t-bold span"))
                 
                 # company Name
-                company = safe_text(item.locator("span.t-14.t-normal span[aria-hidden='true']"))
+                company = await safe_text(item.locator("span.t-14.t-normal span[aria-hidden='true']"))
                 if not company:
-                    company = safe_text(item.locator("span.t-14.t-normal"))
+                    company = await safe_text(item.locator("span.t-14.t-normal"))
                 
                 # duration
-                duration = safe_text(item.locator("span.t-14.t-normal.t-black--light span[aria-hidden='true']"))
+                duration = await safe_text(item.locator("span.t-14.t-normal.t-black--light span[aria-hidden='true']"))
                 if not duration:
-                    duration = safe_text(item.locator("span.pvs-entity__caption-wrapper"))
+                    duration = await safe_text(item.locator("span.pvs-entity__caption-wrapper"))
                 
                 # parsing dates
-                from_date = ""
-                to_date = ""
-                if duration:
-                    
-                    if " - " in duration:
-                        parts = duration.split(" - ")
-                        from_date = parts[0].strip()
-                        to_date = parts[1].strip() if len(parts) > 1 else "Present"
+                from_date, to_date = parse_date_range(duration)
                 
                 if title or company:
                     experiences.append({
@@ -184,21 +328,16 @@ def parse_profile(page, url):
                         "from": from_date,
                         "to": to_date
                     })
-                    
-                    
-                    if i == 0:
-                        current_company = company
-                        current_title = title
         
         # Fallback
         if not experiences:
             exp_sections = page.locator('section#experience-section li')
-            count = min(exp_sections.count(), 10)
+            count = min(await exp_sections.count(), 10)
             for i in range(count):
                 item = exp_sections.nth(i)
-                title = safe_text(item.locator("h3"))
-                company = safe_text(item.locator("p.pv-entity__secondary-title"))
-                duration = safe_text(item.locator(".pv-entity__date-range span"))
+                title = await safe_text(item.locator("h3"))
+                company = await safe_text(item.locator("p.pv-entity__secondary-title"))
+                duration = await safe_text(item.locator(".pv-entity__date-range span"))
                 
                 if title or company:
                     experiences.append({
@@ -207,30 +346,28 @@ def parse_profile(page, url):
                         "from": "",
                         "to": ""
                     })
-                    
-                    if i == 0:
-                        current_company = company
-                        current_title = title
     except Exception as e:
         print(f"Error parsing experience: {e}")
 
+    lap("section_experience")
+
     # Education
     educations = []
     try:
         edu_section = page.locator("section:has(#education)")
-        if edu_section.count() > 0:
+        if (await edu_section.count()) > 0:
             edu_items = edu_section.locator("ul li.artdeco-list__item")
-            count = min(edu_items.count(), 5)
+            count = min(await edu_items.count(), 5)
             
             for i in range(count):
                 item = edu_items.nth(i)
-                school = safe_text(item.locator("span.mr1.hoverable-link-text.t-bold span[aria-hidden='true']"))
+                school = await safe_text(item.locator("span.mr1.hoverable-link-text.t-bold span[aria-hidden='true']"))
                 if not school:
-                    school = safe_text(item.locator("span.mr1.t-bold span"))
+                    school = await safe_text(item.locator("span.mr1.t-bold span"))
                 
-                degree = safe_text(item.locator("span.t-14.t-normal span[aria-hidden='true']"))
+                degree = await safe_text(item.locator("span.t-14.t-normal span[aria-hidden='true']"))
                 if not degree:
-                    degree = safe_text(item.locator("span.t-14.t-normal"))
+                    degree = await safe_text(item.locator("span.t-14.t-normal"))
                 
                 if school:
                     educations.append({"school": school, "degree": degree})
@@ -238,254 +375,799 @@ def parse_profile(page, url):
         # Fallback
         if not educations:
             edu_sections = page.locator('#education-section li')
-            count = min(edu_sections.count(), 5)
+            count = min(await edu_sections.count(), 5)
             for i in range(count):
                 item = edu_sections.nth(i)
-                school = safe_text(item.locator("h3"))
-                degree = safe_text(item.locator(".pv-entity__degree-name"))
+                school = await safe_text(item.locator("h3"))
+                degree = await safe_text(item.locator(".pv-entity__degree-name"))
                 if school:
                     educations.append({"school": school, "degree": degree})
     except Exception as e:
         print(f"Error parsing education: {e}")
 
+    lap("section_education")
+    return {
+        "full_name": full_name,
+        "headline": headline,
+        "location": location,
+        "about": about,
+        "profile_image_url": profile_image_url,
+        "experiences": experiences,
+        "educations": educations,
+    }
+
+async def fetch_contact_info(page):
+    """Read email/phone from the contact info modal, clicking the profile's button if it isn't open yet"""
+    from playwright.async_api import TimeoutError as PWTimeoutError
+
+    timeout = get_config().contact_wait_timeout
     # Contact info
     contact_info = {}
     try:
-        # clicking on contact info button if available on the page
-        contact_btn = page.locator("a#top-card-text-details-contact-info, a:has-text('Contact info')")
-        if contact_btn.count() > 0:
-            contact_btn.first.click()
-            time.sleep(2)
-            
+        try:
+            # already open when the page is the profile's contact info overlay
+            await page.wait_for_selector(CONTACT_MODAL_SELECTOR, timeout=timeout)
+            opened = True
+        except PWTimeoutError:
+            opened = False
+        if not opened:
+            # clicking on contact info button if available on the page
+            contact_btn = page.locator("a#top-card-text-details-contact-info, a:has-text('Contact info')")
+            if (await contact_btn.count()) > 0:
+                await contact_btn.first.click()
+                opened = True
+                try:
+                    await page.wait_for_selector(CONTACT_MODAL_SELECTOR, timeout=timeout)
+                except PWTimeoutError:
+                    pass
+        if opened:
             # email
             email_elem = page.locator("section.pv-contact-info__contact-type.ci-email a")
-            if email_elem.count() > 0:
-                email = safe_text(email_elem.first)
+            if (await email_elem.count()) > 0:
+                email = await safe_text(email_elem.first)
                 if email:
                     contact_info['email'] = email
             
             # phone
             phone_elem = page.locator("section.pv-contact-info__contact-type.ci-phone span.t-14")
-            if phone_elem.count() > 0:
-                phone = safe_text(phone_elem.first)
+            if (await phone_elem.count()) > 0:
+                phone = await safe_text(phone_elem.first)
                 if phone:
                     contact_info['phone'] = phone
-            
-            
-            try:
-                close_btn = page.locator("button[aria-label='Dismiss']")
-                if close_btn.count() > 0:
-                    close_btn.first.click()
-                    time.sleep(1)
-            except:
-                pass
+            # the modal is left open: the next profile is a new navigation anyway
     except Exception as e:
         print(f"Error getting contact info: {e}")
+    return contact_info
+
+BROWSER_ARGS = [
+    "--start-maximized",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-extensions",
+    "--disable-plugins-discovery",
+    "--no-sandbox",  # Required for Docker
+    "--disable-setuid-sandbox",  # Required for Docker
+    "--disable-dev-shm-usage"  # Overcome limited resource problems
+]
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+async def launch_browser(p):
+    # launching browser in headless mode for Docker deployment
+    # Use headless=False for local development with UI
+    return await p.chromium.launch(headless=get_config().headless, args=BROWSER_ARGS)
+
+async def new_context(browser, storage_state=None, blocker=None):
+    """Create a browser context, optionally reusing a logged-in storage state
 
-   
-    contact_info_str = ""
-    if contact_info:
-        parts = []
-        if 'email' in contact_info:
-            parts.append(f"Email: {contact_info['email']}")
-        if 'phone' in contact_info:
-            parts.append(f"Phone: {contact_info['phone']}")
-        contact_info_str = " | ".join(parts)
-
-    # Collected data
-    record = {
+    With a `blocker` (see resource_blocker.py) unneeded requests are aborted.
+    """
+    context = await browser.new_context(
+        viewport={"width": 1366, "height": 768},
+        user_agent=USER_AGENT,
+        storage_state=storage_state,
+    )
+    if blocker:
+        await blocker.attach(context)
+    return context
+
+async def new_page(context):
+    page = await context.new_page()
+    
+    page.on("pageerror", lambda err: None)
+    page.on("console", lambda msg: None if msg.type == "error" else None)
+    return page
+
+async def wait_or_stop(delay, stop_check=None):
+    """Sleep for `delay` seconds, returning True early if a stop was requested"""
+    loop = asyncio.get_running_loop()
+    start_time = loop.time()
+    while loop.time() - start_time < delay:
+        if stop_check and stop_check():
+            print(f"Stop requested during delay, breaking immediately")
+            return True
+        await asyncio.sleep(min(0.5, delay - (loop.time() - start_time)))  # Check every 0.5 seconds
+    return False
+
+def error_record(url, error_msg):
+    return {
         "profile_url": url,
         "scrape_date": datetime.now().isoformat(),
-        "linkedin_id": slug,
-        "full_name": full_name,
-        "first_name": first_name,
-        "last_name": last_name,
-        "headline": headline,
-        "current_company": current_company,
-        "current_title": current_title,
-        "location": location,
-        "about": about,
-        "experience": json.dumps(experiences, ensure_ascii=False),
-        "education": json.dumps(educations, ensure_ascii=False),
-        "profile_image_url": profile_image_url,
-        "contact_info": contact_info_str,
+        "linkedin_id": profile_slug(url) if "/" in url else "unknown",
+        "error": error_msg,
     }
-    return record
 
-def scrape_profiles(profile_urls, status_callback=None, stop_check=None):
-    """Main scraping function that can be called from Flask app"""
-    
-    csv_path = OUTPUT_DIR / f"linkedin_profiles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-    browser = None
+
+class BatchState:
+    """Work queue and shared bookkeeping for the workers of one scrape_profiles run
+
+    All workers run on the same event loop, so no locking is needed.
+    Failures that `retry_policy` retries wait in `retries` until their
+    backoff has passed and are only picked up once `work` is empty.
+    `timings` collects how long each phase of the run took (see metrics.py).
+    `in_flight` counts the profiles workers are visiting right now: an
+    account that hits an auth wall puts its profile back on `work`, so
+    workers wait for those before deciding the queue is empty.
+    Records of profiles that want contact info (`contact_info`: True for
+    all, or a set of URLs) are held in `held` until the contact info pass
+    has been over them.
+    """
+
+    def __init__(self, profile_urls, sink, status_callback=None, stop_check=None, artifacts=None, pacing=None,
+                 limiter=None, manifest=None, cache=None, retry_policy=None, timings=None, contact_info=None):
+        self.total = len(profile_urls)
+        self.sink = sink
+        self.manifest = manifest
+        self.cache = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.artifacts = artifacts
+        self.pacing = pacing or Pacing.from_env()
+        self.limiter = limiter or RateLimiter()
+        self.status_callback = status_callback
+        self.stop_check = stop_check
+        self.success_count = 0
+        # profiles finished so far (scraped, served from cache or given up on), reported as
+        # the progress; URL indices aren't, since workers and retries finish out of order
+        self.processed = 0
+        self.work = collections.deque(enumerate(profile_urls, start=1))
+        self.retry_policy = retry_policy or RetryPolicy()
+        # failed attempts per URL, and a heap of (ready_at, idx, url) waiting to be retried
+        self.attempts = collections.Counter()
+        self.retries = []
+        self.in_flight = 0
+        # pages opened in this run per account email, for recycling pooled contexts
+        self.visits = collections.Counter()
+        self.timings = timings or PhaseTimings()
+        self.contact_info = contact_info
+        # url -> (idx, record), in the order the profiles were scraped
+        self.held = {}
+
+    def notify(self, *args, **kwargs):
+        if self.status_callback:
+            self.status_callback(*args, **kwargs)
+
+    def should_stop(self):
+        return bool(self.stop_check and self.stop_check())
+
+    async def next_item(self):
+        """Return the next (idx, url) to scrape, or None when the batch is done or stopped
+
+        Once the queue is empty, waits for scheduled retries to come due.
+        """
+        loop = asyncio.get_running_loop()
+        while not self.should_stop():
+            if self.work:
+                return self.work.popleft()
+            if not self.retries:
+                if not self.in_flight:
+                    return None
+                # another worker may still hand its profile back
+                if await wait_or_stop(0.5, self.stop_check):
+                    return None
+                continue
+            wait = self.retries[0][0] - loop.time()
+            if wait <= 0:
+                _, idx, url = heapq.heappop(self.retries)
+                return idx, url
+            if await wait_or_stop(min(wait, 1.0), self.stop_check):
+                return None
+        return None
+
+    def schedule_retry(self, idx, url, delay, reason):
+        heapq.heappush(self.retries, (asyncio.get_running_loop().time() + delay, idx, url))
+        self.notify(self.processed, self.total, f"Will retry profile {idx}/{self.total} in {delay:.0f}s ({reason})")
+
+    def pending(self):
+        """Profiles neither scraped nor given up on"""
+        return len(self.work) + len(self.retries)
+
+    def cache_stats(self):
+        """Extra status_callback arguments reporting cache hits/misses, if the cache is on"""
+        if not self.cache:
+            return {}
+        return {"cache_hits": self.cache_hits, "cache_misses": self.cache_misses}
+
+    def cached_record(self, url):
+        """Fresh cached record for `url`, counting the lookup as a hit or miss"""
+        if not self.cache:
+            return None
+        rec = self.cache.get(profile_slug(url))
+        if rec is None:
+            self.cache_misses += 1
+            return None
+        self.cache_hits += 1
+        # the cached data may have been found under another variant of the URL
+        return dict(rec, profile_url=url)
+
+    def wants_contact_info(self, rec):
+        if not self.contact_info or rec.get("contact_info"):
+            return False
+        return self.contact_info is True or rec["profile_url"] in self.contact_info
+
+    def write_record(self, rec):
+        with self.timings.phase("write"):
+            self.sink.write(rec)
+            if self.manifest:
+                self.manifest.mark(rec["profile_url"], DONE)
+
+    def record_success(self, idx, rec, cached=False):
+        self.processed += 1
+        if not cached and self.cache:
+            self.cache.put(rec)
+        if self.wants_contact_info(rec):
+            # written once the contact info pass has added to it
+            self.held[rec["profile_url"]] = (idx, rec)
+        else:
+            self.write_record(rec)
+        self.success_count += 1
+        message = f"Served profile {idx}/{self.total} from cache" if cached else f"Scraping profile {idx}/{self.total}"
+        self.notify(self.processed, self.total, message, str(self.sink.path),
+                    has_success=self.success_count == 1, **self.cache_stats())
+
+    def next_held(self):
+        """Oldest held record as (idx, record), or None when there are none left or the run was stopped"""
+        if self.should_stop() or not self.held:
+            return None
+        url = next(iter(self.held))
+        return self.held.pop(url)
+
+    def record_enriched(self, rec):
+        """Write a held record after the contact info pass, with or without contact info"""
+        if self.cache and rec.get("contact_info"):
+            self.cache.put(rec)
+        self.write_record(rec)
+
+    def flush_held(self):
+        """Write the records still held, e.g. when the run stops before the contact info pass is done"""
+        while self.held:
+            _, rec = self.held.pop(next(iter(self.held)))
+            self.write_record(rec)
+
+    def record_rejected(self, url, error_msg):
+        """Record an input line that was rejected before scraping started"""
+        self.sink.write(error_record(url, error_msg))
+        self.notify(0, self.total, f"Skipped invalid URL: {url}", failed_url=url)
+
+    def record_failure(self, idx, url, error_msg):
+        self.processed += 1
+        # Save even error records
+        self.sink.write(error_record(url, error_msg))
+        if self.manifest:
+            self.manifest.mark(url, FAILED, error_msg)
+        # Notify failed URL
+        self.notify(self.processed, self.total, f"Failed to scrape profile {idx}/{self.total}", failed_url=url)
+
+
+class IncompleteScrapeError(RuntimeError):
+    """A run that ended with profiles neither scraped nor given up on, e.g. because no account could log in
+
+    What was scraped is in the output file at `path`; resume_job picks up
+    the `pending` profiles.
+    """
+
+    def __init__(self, message, path, pending):
+        super().__init__(message)
+        self.path = path
+        self.pending = pending
+
+
+async def capture_failure(page, url, artifacts):
+    """Save whatever the page shows after a failure, if the artifact policy wants it"""
+    if not artifacts:
+        return
+    try:
+        await artifacts.capture(page, profile_slug(url), failed=True)
+    except Exception:
+        pass
+
+async def scrape_one(page, idx, url, state, seat=None):
+    """Scrape a single profile with `seat`'s account and record the outcome, returning the pacing delay to apply
+
+    Failures are classified (see retry_policy.py): retryable ones are
+    scheduled again with backoff, the rest are recorded as error rows. An
+    auth wall logs the seat in again and puts the profile back; only if that
+    login fails is the account taken out of rotation.
+    """
+    account = seat.account if seat else None
+    limiter = (seat.limiter if seat else None) or state.limiter
+    print(f"[{idx}/{state.total}] Visiting {url}")
     
+    #error handling while parsing the profiles
     try:
-        with sync_playwright() as p:
-            # launching browser in headless mode for Docker deployment
-            # Use headless=False for local development with UI
-            is_headless = os.getenv('HEADLESS_MODE', 'true').lower() == 'true'
-            
-            browser = p.chromium.launch(
-                headless=is_headless, 
-                args=[
-                    "--start-maximized",
-                    "--disable-blink-features=AutomationControlled",
-                    "--disable-extensions",
-                    "--disable-plugins-discovery",
-                    "--no-sandbox",  # Required for Docker
-                    "--disable-setuid-sandbox",  # Required for Docker
-                    "--disable-dev-shm-usage"  # Overcome limited resource problems
-                ]
-            )
-            context = browser.new_context(
-                viewport={"width": 1366, "height": 768},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-            page = context.new_page()
-            
-            
-            page.on("pageerror", lambda err: None)
-            page.on("console", lambda msg: None if msg.type == "error" else None)
+        # validating URL format
+        if not url.startswith('http'):
+            raise ScrapeError(INVALID, f"Invalid URL format: {url}")
+        
+        # no need to open the page if we scraped this profile recently
+        rec = state.cached_record(url)
+        if rec is not None:
+            state.record_success(idx, rec, cached=True)
+            return 0
+        
+        # wait for the account's (and job's) rate budget
+        with state.timings.phase("rate_limit"):
+            acquired = await limiter.acquire(state.stop_check)
+        if not acquired:
+            return 0
+        state.visits[account.email if account else None] += 1
+        logins = seat.logins if seat else 0
+        
+        with state.timings.phase("profile"):
+            rec = await parse_profile_async(page, url, artifacts=state.artifacts, pacing=state.pacing,
+                                            timings=state.timings)
+        limiter.record(True)
+        if account:
+            account.record(SUCCESS)
+        state.record_success(idx, rec)
+        return state.pacing.delay_after("success")
+        
+    except Exception as e:
+        kind = classify_error(e)
+        print(f"Error ({kind}) for {url}: {e}")
+        if kind == INVALID:
+            state.record_failure(idx, url, error_message(kind, e))
+            return state.pacing.delay_after("invalid")
+        
+        if kind != NOT_FOUND:
+            limiter.record(False)
+        if kind == AUTH_WALL and seat is not None:
+            # our session isn't trusted any more, not the profile's fault
+            if not await seat.relogin(page, logins, state.timings):
+                # benched; the profile goes back for the other accounts
+                state.work.append((idx, url))
+                return 0
+            state.attempts[url] += 1
+            if state.retry_policy.retry_delay(kind, state.attempts[url]) is not None:
+                state.work.append((idx, url))
+                return 0
+            # still walled off with a fresh login, so it's the profile
+            state.record_failure(idx, url, error_message(kind, e))
+            return state.pacing.delay_after("error")
+        if account and kind != NOT_FOUND:
+            account.record(TIMEOUT if kind == TRANSIENT else ERROR)
+        await capture_failure(page, url, state.artifacts)
+        
+        state.attempts[url] += 1
+        delay = state.retry_policy.retry_delay(kind, state.attempts[url])
+        if delay is not None:
+            state.schedule_retry(idx, url, delay, kind)
+        else:
+            state.record_failure(idx, url, error_message(kind, e))
+        return state.pacing.delay_after("timeout" if kind == TRANSIENT else "error")
 
-            # Login
-            if status_callback:
-                status_callback(0, len(profile_urls), "Logging into LinkedIn...")
-            
+async def run_worker(page, state, worker_id=0, seat=None):
+    """Take URLs from the shared queue until it is empty, pacing this page on its own
+
+    A worker whose account (`seat.account`) was taken out of rotation stops
+    and leaves the rest of the queue to the other accounts' workers.
+    """
+    account = seat.account if seat else None
+    if worker_id and await wait_or_stop(state.pacing.start_offset(worker_id), state.stop_check):
+        return
+    while True:
+        if account and not account.available():
+            print(f"Worker {worker_id} stopping: account {account.email} is out of rotation")
+            return
+        item = await state.next_item()
+        if item is None:
+            return
+        idx, url = item
+        state.notify(state.processed, state.total, f"Scraping profile {idx}/{state.total}")
+        state.in_flight += 1
+        try:
+            delay = await scrape_one(page, idx, url, state, seat)
+        finally:
+            state.in_flight -= 1
+        with state.timings.phase("pacing"):
+            stopped = await wait_or_stop(delay, state.stop_check)
+        if stopped:
+            return
+
+async def run_contact_worker(page, state, worker_id=0, seat=None):
+    """Second pass: take held records and add their contact info until none are left
+
+    A profile whose contact info can't be read is written as it is; the
+    visit still counts against the account's rate limit and health. An auth
+    wall logs the seat in again, as in scrape_one.
+    """
+    account = seat.account if seat else None
+    limiter = (seat.limiter if seat else None) or state.limiter
+    while True:
+        if account and not account.available():
+            print(f"Worker {worker_id} stopping: account {account.email} is out of rotation")
+            return
+        item = state.next_held()
+        if item is None:
+            return
+        idx, rec = item
+        url = rec["profile_url"]
+        with state.timings.phase("rate_limit"):
+            acquired = await limiter.acquire(state.stop_check)
+        if not acquired:
+            state.record_enriched(rec)
+            return
+        state.visits[account.email if account else None] += 1
+        logins = seat.logins if seat else 0
+        state.notify(state.processed, state.total, f"Fetching contact info of profile {idx}/{state.total}")
+        outcome = "success"
+        try:
+            rec = await enrich_contact_info(page, rec, state.timings)
+            limiter.record(True)
+            if account:
+                account.record(SUCCESS)
+        except Exception as e:
+            kind = classify_error(e)
+            print(f"Contact info error ({kind}) for {url}: {e}")
+            if kind != NOT_FOUND:
+                limiter.record(False)
+            if kind == AUTH_WALL and seat is not None:
+                await seat.relogin(page, logins, state.timings)
+            elif account and kind != NOT_FOUND:
+                account.record(TIMEOUT if kind == TRANSIENT else ERROR)
+            outcome = "timeout" if kind == TRANSIENT else "error"
+        state.record_enriched(rec)
+        with state.timings.phase("pacing"):
+            stopped = await wait_or_stop(state.pacing.delay_after(outcome), state.stop_check)
+        if stopped:
+            return
+
+
+class Seat:
+    """A logged-in context of one account, shared by the workers that scrape with it"""
+
+    def __init__(self, context, account=None, limiter=None, page=None, session_cache=None):
+        self.context = context
+        self.account = account
+        self.limiter = limiter
+        # a page already open in the context, handed to the first worker
+        self.page = page
+        self.session_cache = session_cache
+        # logins since the seat was opened; tells workers whether an auth wall predates the last one
+        self.logins = 0
+        self._login_lock = asyncio.Lock()
+
+    async def relogin(self, page, logins, timings=None):
+        """Log the account in again after an auth wall, returning False if it was taken out of rotation
+
+        The workers of a seat share its cookies, so when several of them hit
+        the wall only the first logs in; the rest see `logins` (the count
+        when their visit started) is behind and just carry on.
+        """
+        async with self._login_lock:
+            if self.logins != logins:
+                return self.account.available()
+            print(f"Auth wall for {self.account.email}, logging in again")
+            if self.session_cache:
+                self.session_cache.invalidate()
+            await self.context.clear_cookies()
             try:
-                login_linkedin(page)
+                await ensure_logged_in(page, self.session_cache, account=self.account, timings=timings)
             except Exception as e:
-                print(f"Login error: {e}")
-                if status_callback:
-                    status_callback(0, len(profile_urls), f"Login failed: {str(e)}")
-                
-                time.sleep(5)
-                if browser:
-                    browser.close()
-                raise
+                print(f"Login error for {self.account.email}: {e}")
+                if self.account.available():
+                    self.account.record(CHALLENGE)
+                return False
+            self.logins += 1
+            return True
 
-            results = []
-            for idx, url in enumerate(profile_urls, start=1):
-                
-                if stop_check and stop_check():
-                    print(f"Stopping scraper as requested by user")
-                    if status_callback:
-                        status_callback(idx - 1, len(profile_urls), "Stopped by user", str(csv_path))
-                    break
-                
-                if status_callback:
-                    status_callback(idx, len(profile_urls), f"Scraping profile {idx}/{len(profile_urls)}")
-                
-                print(f"[{idx}/{len(profile_urls)}] Visiting {url}")
-                
-                #error handling while parsing the profiles
+async def open_seat(browser, account, limiter=None, session_cache=None, blocker=None, timings=None):
+    """Log `account` into a new context of `browser`, or return None if it can't log in"""
+    session_cache = session_cache or account.session_cache()
+    storage_state = session_cache.load() if session_cache else None
+    context = await new_context(browser, storage_state=storage_state, blocker=blocker)
+    page = await new_page(context)
+    try:
+        await ensure_logged_in(page, session_cache, restored=storage_state is not None, account=account,
+                               timings=timings)
+    except Exception as e:
+        print(f"Login error for {account.email}: {e}")
+        await context.close()
+        return None
+    return Seat(context, account, limiter, page, session_cache)
+
+async def run_batch(seats, state, workers):
+    """Drive `workers` pages over the batch, spread round-robin across the accounts' `seats`
+
+    Once the batch is done the same pages make the contact info pass over
+    the records held for it. Pages opened here are closed afterwards so a
+    pooled context can be reused.
+    """
+    pages = []
+    opened = []
+    for worker_id in range(workers):
+        seat = seats[worker_id % len(seats)]
+        if seat.page is not None:
+            page, seat.page = seat.page, None
+        else:
+            page = await new_page(seat.context)
+            opened.append(page)
+        pages.append((page, seat))
+    try:
+        await asyncio.gather(*(
+            run_worker(page, state, worker_id, seat)
+            for worker_id, (page, seat) in enumerate(pages)
+        ))
+        if state.held and not state.should_stop():
+            print(f"Fetching contact info of {len(state.held)} profiles")
+            await asyncio.gather(*(
+                run_contact_worker(page, state, worker_id, seat)
+                for worker_id, (page, seat) in enumerate(pages)
+            ))
+    finally:
+        for pg in opened:
+            try:
+                await pg.close()
+            except Exception:
+                pass
+
+async def scrape_profiles_async(profile_urls, status_callback=None, stop_check=None, sink=None,
+                                output_format=None, workers=None, session_cache=None, pool=None,
+                                rate_limit=None, job_id=None, profile_cache=None, accounts=None, pacing=None,
+                                timings=None, contact_info=None):
+    """Async scraping engine: `workers` pages share the batch's logged-in browser contexts
+
+    Page loads of the workers overlap on the event loop while each page keeps
+    its own pacing. Records are streamed to `sink` as they are produced. If no
+    sink is given a timestamped CSV (or JSONL, see OUTPUT_FORMAT) file in
+    the configured output directory (OUTPUT_DIR, default output/) is used. The logged-in session is cached on disk (see
+    session_cache.py) and reused by later runs instead of logging in again.
+    With a `pool` (see browser_pool.py) a warm context is leased from it
+    instead of launching a browser for this run; the coroutine must then
+    run on the pool's event loop. Every profile takes a token from the
+    account's rate limiter (see rate_limiter.py), shared by all workers and
+    jobs; `rate_limit` ({"profiles_per_hour": ..., "burst": ...}) adds a
+    budget for this job on top.
+
+    URLs are canonicalized and deduplicated first (see url_normalizer.py);
+    lines that aren't profile URLs get an error row without being visited.
+    Profiles scraped recently are served from `profile_cache` (default: the
+    SQLite cache in profile_cache.py) without opening a page; hits and
+    misses are reported to `status_callback` as cache_hits/cache_misses.
+
+    Workers are spread over the LinkedIn accounts in rotation (`accounts`,
+    default: the process-wide AccountPool from accounts.py), one context per
+    account, each with its own session and rate limit. An account that
+    degrades is benched and its workers stop, leaving the queue to the rest.
+
+    Progress is checkpointed under `job_id` (a new id if not given, see
+    checkpoint.py); after a crash or stop, resume_job(job_id) continues
+    into the same output file.
+
+    `pacing` (default: Pacing.from_env()) sets the delays between profiles
+    and `timings` (a metrics.PhaseTimings) collects the run's phase timings.
+
+    Contact info takes a second visit per profile, so it is opt-in:
+    `contact_info` (default CONTACT_INFO) is True for every profile or a
+    list of the profile URLs that need it. Once the batch is done those
+    profiles are revisited for their contact info modal, and their records
+    are written with it.
+    """
+
+    # canonical URLs only, so variants of a profile are scraped once
+    batch = normalize_profile_urls(profile_urls)
+    profile_urls = batch.urls
+    print(f"URLs: {batch.summary()}")
+    
+    config = get_config()
+    # fail before any output is created when there is no one to log in as
+    account_pool = accounts or default_account_pool()
+    if not account_pool.accounts:
+        config.require_credentials()
+    accounts = account_pool.active()
+    if not accounts:
+        raise RuntimeError("No LinkedIn account is in rotation")
+
+    job_id = job_id or new_job_id()
+    output_format = (output_format or config.output_format).lower()
+    manifest = JobManifest.open(
+        job_id,
+        profile_urls,
+        sink.path if sink is not None else config.output_path(job_id, output_format),
+        output_format,
+    )
+    print(f"Job {job_id}: {len(profile_urls)} profiles")
+    owns_sink = sink is None
+    if owns_sink:
+        sink = open_sink(
+            manifest.output_path,
+            fmt=manifest.output_format,
+            fsync_every=config.fsync_every,
+        )
+    csv_path = sink.path
+    # at least one worker per account in rotation, so throughput grows with the accounts
+    workers = max(int(workers or config.workers), len(accounts))
+    workers = max(1, min(workers, len(profile_urls) or 1))
+    accounts = accounts[:workers]
+    artifacts = default_artifact_writer()
+    limiters = limiters_for_job([account.email for account in accounts], **(rate_limit or {}))
+    if profile_cache is None:
+        profile_cache = default_profile_cache()
+    if contact_info is None:
+        contact_info = config.contact_info
+    if contact_info and contact_info is not True:
+        contact_info = {canonical_profile_url(url, config.base_url) for url in contact_info} - {None}
+    state = BatchState(profile_urls, sink, status_callback, stop_check, artifacts, pacing,
+                       limiter=limiters[accounts[0].email], manifest=manifest, cache=profile_cache, timings=timings,
+                       contact_info=contact_info)
+    for url in batch.rejected:
+        state.record_rejected(url, "Not a LinkedIn profile URL")
+    blocker = pool.blocker if pool is not None else default_resource_blocker()
+    browser = None
+    
+    try:
+        if pool is not None:
+            state.notify(0, state.total, "Waiting for a logged-in browser...")
+            async with contextlib.AsyncExitStack() as stack:
+                leases = []
+                seats = []
+                for account in accounts:
+                    # wait for the first context only; extra accounts take whatever slots are free
+                    try:
+                        # a cold pool launches the browser and logs in here
+                        with state.timings.phase("lease"):
+                            lease = await stack.enter_async_context(pool.lease(account, wait=not seats))
+                    except RuntimeError as e:
+                        print(f"Skipping account {account.email}: {e}")
+                        continue
+                    if lease is None:
+                        break
+                    leases.append(lease)
+                    seats.append(Seat(lease.context, account, limiters[account.email],
+                                      session_cache=account.session_cache()))
+                if not seats:
+                    raise RuntimeError("Could not log in with any LinkedIn account")
                 try:
-                    # validating URL format
-                    if not url.startswith('http'):
-                        raise ValueError(f"Invalid URL format: {url}")
-                    
-                    rec = parse_profile(page, url)
-                    results.append(rec)
-                    
-                    # Save intermediate results after each successful scrape
-                    save_csv(csv_path, results)
-                    
-                    
-                    if status_callback and len([r for r in results if 'error' not in r or not r['error']]) == 1:
-                        status_callback(idx, len(profile_urls), f"Scraping profile {idx}/{len(profile_urls)}", str(csv_path), has_success=True)
-                    elif status_callback:
-                        status_callback(idx, len(profile_urls), f"Scraping profile {idx}/{len(profile_urls)}", str(csv_path))
-                    
-                    
-                    delay = random.uniform(5.0, 12.0)
-                    start_time = time.time()
-                    while time.time() - start_time < delay:
-                        if stop_check and stop_check():
-                            print(f"Stop requested during delay, breaking immediately")
-                            break
-                        time.sleep(0.5)  # Check every 0.5 seconds
-                    
-                except PWTimeoutError as e:
-                    error_msg = f"Timeout accessing profile"
-                    print(f"Timeout error for {url}: {e}")
-                    results.append({
-                        "profile_url": url,
-                        "scrape_date": datetime.now().isoformat(),
-                        "linkedin_id": url.rstrip("/").split("/")[-1] if "/" in url else "unknown",
-                        "error": error_msg,
-                    })
-                    # Save even error records
-                    save_csv(csv_path, results)
-                    # Notify failed URL
-                    if status_callback:
-                        status_callback(idx, len(profile_urls), f"Failed to scrape profile {idx}/{len(profile_urls)}", failed_url=url)
-                    time.sleep(random.uniform(3.0, 6.0))
-                    
-                except ValueError as e:
-                    error_msg = str(e)
-                    print(f"Validation error for {url}: {e}")
-                    results.append({
-                        "profile_url": url,
-                        "scrape_date": datetime.now().isoformat(),
-                        "linkedin_id": url.rstrip("/").split("/")[-1] if "/" in url else "unknown",
-                        "error": error_msg,
-                    })
-                    save_csv(csv_path, results)
-                    # Notify failed URL
-                    if status_callback:
-                        status_callback(idx, len(profile_urls), f"Failed to scrape profile {idx}/{len(profile_urls)}", failed_url=url)
-                    time.sleep(random.uniform(2.0, 4.0))
-                    
-                except Exception as e:
-                    error_msg = f"Failed to scrape: {str(e)}"
-                    print(f"Error parsing {url}: {e}")
-                    results.append({
-                        "profile_url": url,
-                        "scrape_date": datetime.now().isoformat(),
-                        "linkedin_id": url.rstrip("/").split("/")[-1] if "/" in url else "unknown",
-                        "error": error_msg,
-                    })
-                    save_csv(csv_path, results)
-                    # Notify failed URL
-                    if status_callback:
-                        status_callback(idx, len(profile_urls), f"Failed to scrape profile {idx}/{len(profile_urls)}", failed_url=url)
-                    time.sleep(random.uniform(3.0, 6.0))
-
-            print(f"Done. CSV saved to: {csv_path}")
-            if browser:
-                browser.close()
-            
-            return str(csv_path)
+                    await run_batch(seats, state, workers)
+                finally:
+                    for lease, seat in zip(leases, seats):
+                        # only this run's visits: other jobs may be using the same account
+                        lease.pages_used += state.visits[seat.account.email]
+        else:
+            # the browser machinery is only loaded once a scrape needs it
+            from playwright.async_api import async_playwright
+
+            async with async_playwright() as p:
+                with state.timings.phase("browser_launch"):
+                    browser = await launch_browser(p)
+
+                # Login
+                state.notify(0, state.total, "Logging into LinkedIn...")
+                seats = []
+                for account in accounts:
+                    # the env account can still use a session cache passed in by the caller
+                    cache = session_cache if session_cache is not None and account.email == config.email else None
+                    seat = await open_seat(browser, account, limiters[account.email], cache, blocker, state.timings)
+                    if seat is not None:
+                        seats.append(seat)
+                if not seats:
+                    state.notify(0, state.total, "Login failed: no LinkedIn account could log in")
+                    await browser.close()
+                    raise RuntimeError("Could not log in with any LinkedIn account")
+
+                # each account's login page becomes one of its workers
+                await run_batch(seats, state, workers)
+                if browser:
+                    await browser.close()
+
+        incomplete = None
+        if state.pending() and not state.should_stop():
+            reason = "every account is out of rotation" if not account_pool.active() else "no worker could take them"
+            incomplete = f"{state.pending()} profiles left for resume_job ({reason})"
+            print(incomplete)
+
+        if state.should_stop():
+            print(f"Stopping scraper as requested by user")
+            state.notify(state.processed, state.total, "Stopped by user", str(csv_path))
+
+        if artifacts:
+            await asyncio.to_thread(artifacts.flush)
+        if blocker:
+            print(blocker.summary())
+        for account in accounts:
+            info = account.summary()
+            print(f"Account {info['email']}: {info['profiles']} profiles, {info['timeouts']} timeouts, "
+                  f"{info['errors']} errors, {info['challenges']} challenges")
+        print(f"Done. Results saved to: {csv_path}")
+        print(f"Timings:\n{state.timings.report()}")
+        # the per-job summary ends up in the job's status (see app.py)
+        state.notify(state.processed, state.total, incomplete or "Finished", str(csv_path),
+                     timings=state.timings.summary())
+        if incomplete:
+            # not a finished scrape: the job fails with the reason instead of completing
+            raise IncompleteScrapeError(incomplete, str(csv_path), state.pending())
+        return str(csv_path)
     
+    except IncompleteScrapeError:
+        raise
     except Exception as e:
         print(f"Fatal error in scraper: {e}")
         import traceback
         traceback.print_exc()
         if browser:
             try:
-                browser.close()
+                await browser.close()
             except:
                 pass
         raise
+    finally:
+        # records still waiting for contact info are written without it
+        state.flush_held()
+        manifest.close()
+        if owns_sink:
+            sink.close()
+        else:
+            sink.sync()
 
-def save_csv(csv_path, results):
-    """Helper function to save results to CSV"""
-    fieldnames = [
-        "profile_url", "scrape_date", "linkedin_id", "full_name", "first_name",
-        "last_name", "headline", "current_company", "current_title", "location",
-        "about", "experience", "education", "profile_image_url",
-        "contact_info", "error"
-    ]
-    
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in results:
-            # ensure keys exist
-            for k in fieldnames:
-                if k not in r:
-                    r[k] = ""
-            writer.writerow(r)
+def scrape_profiles(profile_urls, status_callback=None, stop_check=None, sink=None, output_format=None,
+                    workers=None, session_cache=None, pool=None, rate_limit=None, job_id=None,
+                    profile_cache=None, accounts=None, pacing=None, timings=None, contact_info=None):
+    """Main scraping function that can be called from Flask app
+
+    Blocking wrapper around scrape_profiles_async; see there for the arguments.
+    """
+    coro = scrape_profiles_async(
+        profile_urls,
+        status_callback=status_callback,
+        stop_check=stop_check,
+        sink=sink,
+        output_format=output_format,
+        workers=workers,
+        session_cache=session_cache,
+        pool=pool,
+        rate_limit=rate_limit,
+        job_id=job_id,
+        profile_cache=profile_cache,
+        accounts=accounts,
+        pacing=pacing,
+        timings=timings,
+        contact_info=contact_info,
+    )
+    if pool is not None:
+        return pool.run(coro)
+    return asyncio.run(coro)
+
+def resume_job(job_id, retry_failed=True, max_attempts=3, **kwargs):
+    """Continue a checkpointed job: scrape its pending URLs and retry failures, appending to its output
+
+    Error rows of retried profiles stay in the output; a later row for the
+    same profile_url supersedes them. Takes the same keyword arguments as
+    scrape_profiles.
+    """
+    manifest = JobManifest.load(job_id)
+    if manifest is None:
+        raise ValueError(f"Unknown job: {job_id}")
+    profile_urls = manifest.remaining(retry_failed=retry_failed, max_attempts=max_attempts)
+    counts = manifest.counts()
+    print(f"Resuming job {job_id}: {counts[DONE]} done, {len(profile_urls)} to go")
+    if not profile_urls:
+        return manifest.output_path
+    return scrape_profiles(profile_urls, job_id=job_id, **kwargs)
 
 if __name__ == "__main__":
+    # python scraper.py --resume <job_id> continues an interrupted job
+    if len(sys.argv) == 3 and sys.argv[1] == "--resume":
+        resume_job(sys.argv[2])
+        sys.exit(0)
     # For testing standalone
     test_urls = [
         "https://www.linkedin.com/in/satyanadella/",
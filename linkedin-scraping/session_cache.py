@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import hashlib
+from pathlib import Path
+
+from config import get_config
+
+
+FEED_PATH = "/feed/"
+# LinkedIn's authentication cookie, without it the session is logged out
+AUTH_COOKIE = "li_at"
+
+
+class SessionCache:
+    """Storage state (cookies/localStorage) of a logged-in context, saved to disk
+
+    A saved state is served until it is older than `ttl` seconds (default
+    SESSION_TTL_HOURS) or its auth cookie has expired, so most runs can skip
+    the login flow entirely.
+    """
+
+    def __init__(self, path, ttl=None):
+        self.path = Path(path)
+        self.ttl = get_config().session_ttl if ttl is None else ttl
+
+    @classmethod
+    def for_account(cls, email, directory=None, **kwargs):
+        # hash the address so it doesn't end up in file names
+        key = hashlib.sha1((email or "default").strip().lower().encode("utf-8")).hexdigest()[:16]
+        return cls(Path(directory or get_config().session_dir) / f"storage_state_{key}.json", **kwargs)
+
+    def load(self):
+        """Return the saved storage state, or None if missing, stale or logged out"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - data.get("saved_at", 0) > self.ttl:
+            return None
+        storage_state = data.get("storage_state") or {}
+        if not has_auth_cookie(storage_state):
+            return None
+        return storage_state
+
+    def save(self, storage_state):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"saved_at": time.time(), "storage_state": storage_state}), encoding="utf-8")
+        # the state holds auth cookies, keep it private to this user
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    def invalidate(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def has_auth_cookie(storage_state):
+    now = time.time()
+    for cookie in storage_state.get("cookies", []):
+        if cookie.get("name") != AUTH_COOKIE or not cookie.get("value"):
+            continue
+        expires = cookie.get("expires", -1)
+        # -1 marks a session cookie
+        if expires == -1 or expires > now:
+            return True
+    return False
+
+
+async def session_is_valid(context):
+    """Cheap check that the context is logged in: fetch the feed without rendering it
+
+    A logged-out request is redirected to the login or authwall page, so
+    redirects are not followed and only a direct 200 counts as logged in.
+    """
+    try:
+        response = await context.request.get(get_config().base_url + FEED_PATH, max_redirects=0, timeout=10000)
+    except Exception:
+        return False
+    return response.status == 200
+
+
+def default_session_cache(email):
+    """Session cache for `email`, or None when disabled with SESSION_CACHE=false"""
+    if not get_config().session_cache:
+        return None
+    return SessionCache.for_account(email)
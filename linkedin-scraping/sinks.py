@@ -0,0 +1,111 @@
+import os
+import csv
+import json
+import time
+from pathlib import Path
+
+
+FIELDNAMES = [
+    "profile_url", "scrape_date", "linkedin_id", "full_name", "first_name",
+    "last_name", "headline", "current_company", "current_title", "location",
+    "about", "experience", "education", "profile_image_url",
+    "contact_info", "error"
+]
+
+
+class ResultSink:
+    """Append-only writer for scraped records.
+
+    Records are written as soon as they are produced and the file is never
+    rewritten, so memory and disk I/O stay flat however long the batch is.
+    Data is flushed after every record and fsynced every `fsync_every`
+    records or `fsync_interval` seconds, whichever comes first.
+    """
+
+    def __init__(self, path, fsync_every=10, fsync_interval=5.0):
+        self.path = Path(path)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # appending lets a later run continue the same file
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        if is_new:
+            self._write_header()
+
+    def _write_header(self):
+        pass
+
+    def _write_record(self, record):
+        raise NotImplementedError
+
+    def write(self, record):
+        self._write_record(record)
+        self.count += 1
+        self._unsynced += 1
+        self._file.flush()
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CsvSink(ResultSink):
+    def __init__(self, path, fieldnames=None, **kwargs):
+        self.fieldnames = fieldnames or FIELDNAMES
+        self._writer = None
+        super().__init__(path, **kwargs)
+
+    def _get_writer(self):
+        if self._writer is None:
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=self.fieldnames, restval="", extrasaction="ignore"
+            )
+        return self._writer
+
+    def _write_header(self):
+        self._get_writer().writeheader()
+
+    def _write_record(self, record):
+        self._get_writer().writerow(record)
+
+
+class JsonlSink(ResultSink):
+    def _write_record(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+SINKS = {
+    "csv": CsvSink,
+    "jsonl": JsonlSink,
+}
+
+
+def open_sink(path, fmt=None, **kwargs):
+    """Open a sink for `path`, picking the format from `fmt` or the file suffix"""
+    fmt = (fmt or Path(path).suffix.lstrip(".") or "csv").lower()
+    if fmt not in SINKS:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    return SINKS[fmt](path, **kwargs)
@@ -0,0 +1,66 @@
+import re
+from urllib.parse import quote, unquote
+
+from config import get_config, DEFAULT_BASE_URL
+
+
+# scheme optional; www., m. and locale subdomains (uk., de., ...) all serve the same profile
+PROFILE_URL_RE = re.compile(r"^(?:https?://)?(?:[a-z0-9-]+\.)?linkedin\.com(?::\d+)?/in/([^/?#\s]+)", re.IGNORECASE)
+
+
+def canonical_profile_url(url, base_url=None):
+    """Canonical https://www.linkedin.com/in/<slug>/ form of a profile URL, or None if it isn't one
+
+    Query strings, fragments, sub-pages (/details/..., /overlay/...) and
+    the case of the slug are dropped, so every variant of a profile maps to
+    the same URL. With another `base_url` (default: LINKEDIN_BASE_URL, see
+    config.py) profiles are pointed there instead.
+    """
+    base_url = base_url or get_config().base_url
+    url = url.strip()
+    if base_url != DEFAULT_BASE_URL and url.startswith(base_url + "/in/"):
+        url = DEFAULT_BASE_URL + url[len(base_url):]
+    match = PROFILE_URL_RE.match(url)
+    if not match:
+        return None
+    slug = match.group(1).lower()
+    if "%" in slug or not slug.isascii():
+        # percent-encode non-ASCII slugs the same way however they were written
+        slug = quote(unquote(slug).strip().lower(), safe="-_.~")
+        if not slug:
+            return None
+    return f"{base_url}/in/{slug}/"
+
+
+class UrlBatch:
+    """Outcome of normalizing a list of profile URLs"""
+
+    def __init__(self):
+        # canonical URLs to scrape, in first-seen order
+        self.urls = []
+        # input lines that were not LinkedIn profile URLs
+        self.rejected = []
+        self.duplicates = 0
+
+    def summary(self):
+        return (f"{len(self.urls)} profiles, {self.duplicates} duplicates removed, "
+                f"{len(self.rejected)} invalid URLs rejected")
+
+
+def normalize_profile_urls(urls, base_url=None):
+    """Canonicalize `urls`, dropping blank lines and duplicates and setting aside non-profile URLs"""
+    base_url = base_url or get_config().base_url
+    batch = UrlBatch()
+    seen = set()
+    for url in urls:
+        if not url or not url.strip():
+            continue
+        canonical = canonical_profile_url(url, base_url)
+        if canonical is None:
+            batch.rejected.append(url.strip())
+        elif canonical in seen:
+            batch.duplicates += 1
+        else:
+            seen.add(canonical)
+            batch.urls.append(canonical)
+    return batch
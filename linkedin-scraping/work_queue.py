@@ -0,0 +1,271 @@
+import json
+import time
+import sqlite3
+import threading
+from pathlib import Path
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from config import get_config
+
+
+class WorkItem:
+    """A claimed URL; `token` identifies the lease to the queue backend"""
+
+    def __init__(self, job_id, url, attempts, token):
+        self.job_id = job_id
+        self.url = url
+        self.attempts = attempts
+        self.token = token
+
+
+class SqliteWorkQueue:
+    """Work queue in a SQLite file, for local runs and containers sharing a volume on one host
+
+    Each (job, URL) pair is one row; claiming sets a lease deadline and a
+    row whose lease ran out (its worker died) can be claimed again.
+    Results are appended to a second table that the coordinator reads.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS work ("
+            " id INTEGER PRIMARY KEY,"
+            " job_id TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'pending',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease_until REAL NOT NULL DEFAULT 0,"
+            " worker TEXT,"
+            " UNIQUE (job_id, url))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS work_claim ON work (state, lease_until)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " id INTEGER PRIMARY KEY,"
+            " job_id TEXT NOT NULL,"
+            " record TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_job ON results (job_id, id)")
+
+    def enqueue(self, job_id, urls):
+        """Add `urls` to the job's work; URLs already queued for the job are left alone"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.executemany("INSERT OR IGNORE INTO work (job_id, url) VALUES (?, ?)",
+                                 [(job_id, url) for url in urls])
+            self._db.execute("COMMIT")
+
+    def claim(self, worker_id, lease=None):
+        """Lease the oldest pending (or abandoned) URL to `worker_id`, or return None
+
+        The URL stays invisible to other workers for `lease` seconds (default
+        WORK_LEASE_SECONDS) before it is handed out again.
+        """
+        lease = lease or get_config().work_lease_seconds
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two workers can't claim the same row
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT id, job_id, url, attempts FROM work"
+                    " WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?)"
+                    " ORDER BY id LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is None:
+                    return None
+                row_id, job_id, url, attempts = row
+                self._db.execute(
+                    "UPDATE work SET state = 'leased', attempts = ?, lease_until = ?, worker = ? WHERE id = ?",
+                    (attempts + 1, now + lease, worker_id, row_id),
+                )
+            finally:
+                self._db.execute("COMMIT")
+        return WorkItem(job_id, url, attempts + 1, [row_id, worker_id])
+
+    def _finish(self, item, state, record=None):
+        row_id, worker_id = item.token
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            # a worker whose lease expired and was re-claimed no longer owns the row
+            owned = self._db.execute(
+                "UPDATE work SET state = ?, lease_until = 0 WHERE id = ? AND worker = ? AND state = 'leased'",
+                (state, row_id, worker_id),
+            ).rowcount
+            if owned and record is not None:
+                self._db.execute("INSERT INTO results (job_id, record) VALUES (?, ?)",
+                                 (item.job_id, json.dumps(record, ensure_ascii=False)))
+            self._db.execute("COMMIT")
+
+    def complete(self, item, record):
+        self._finish(item, "done", record)
+
+    def fail(self, item, record, retry=False):
+        """Give the URL back for another attempt, or store `record` (an error row) as its result"""
+        if retry:
+            self._finish(item, "pending")
+        else:
+            self._finish(item, "failed", record)
+
+    def results(self, job_id, cursor=0):
+        """Records pushed for the job after `cursor`; returns (records, new_cursor)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, record FROM results WHERE job_id = ? AND id > ? ORDER BY id",
+                (job_id, cursor),
+            ).fetchall()
+        if not rows:
+            return [], cursor
+        return [json.loads(record) for _, record in rows], rows[-1][0]
+
+    def cancel(self, job_id):
+        """Drop the job's URLs that no worker has claimed yet"""
+        with self._lock:
+            self._db.execute("DELETE FROM work WHERE job_id = ? AND state = 'pending'", (job_id,))
+
+    def purge(self, job_id):
+        """Forget the job: its URLs, claimed or not, and its results. A worker still holding one is ignored"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("DELETE FROM work WHERE job_id = ?", (job_id,))
+            self._db.execute("DELETE FROM results WHERE job_id = ?", (job_id,))
+            self._db.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# Pops the next item, first putting back items whose lease expired. Runs atomically in Redis.
+REDIS_CLAIM = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, item in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], item)
+    redis.call('RPUSH', KEYS[1], item)
+end
+local item = redis.call('LPOP', KEYS[1])
+if not item then
+    return nil
+end
+local data = cjson.decode(item)
+data['attempts'] = data['attempts'] + 1
+data['worker'] = ARGV[3]
+local leased = cjson.encode(data)
+redis.call('ZADD', KEYS[2], ARGV[2], leased)
+return leased
+"""
+
+# Ends a lease if it is still held, optionally requeueing the item or storing a result
+REDIS_FINISH = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+if ARGV[2] ~= '' then
+    redis.call('RPUSH', KEYS[2], ARGV[2])
+end
+if ARGV[3] ~= '' then
+    redis.call('RPUSH', KEYS[3], ARGV[3])
+end
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """Work queue in Redis, for worker containers on several hosts
+
+    Pending items are a list, leased items a sorted set scored by lease
+    deadline and each job's results a list, so claims and completions are
+    single atomic scripts.
+    """
+
+    def __init__(self, url, prefix="linkedin"):
+        if redis is None:
+            raise RuntimeError("a redis:// work queue needs the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.pending_key = f"{prefix}:pending"
+        self.leases_key = f"{prefix}:leases"
+        self.prefix = prefix
+        self._claim = self.client.register_script(REDIS_CLAIM)
+        self._finish = self.client.register_script(REDIS_FINISH)
+
+    def _job_key(self, job_id, name):
+        return f"{self.prefix}:job:{job_id}:{name}"
+
+    def enqueue(self, job_id, urls):
+        """Add `urls` to the job's work; URLs already queued for the job are left alone"""
+        urls = list(urls)
+        if not urls:
+            return
+        added = self.client.pipeline()
+        for url in urls:
+            added.sadd(self._job_key(job_id, "urls"), url)
+        pipe = self.client.pipeline()
+        for url, is_new in zip(urls, added.execute()):
+            if is_new:
+                pipe.rpush(self.pending_key, json.dumps({"job_id": job_id, "url": url, "attempts": 0}))
+        pipe.execute()
+
+    def claim(self, worker_id, lease=None):
+        lease = lease or get_config().work_lease_seconds
+        now = time.time()
+        leased = self._claim(keys=[self.pending_key, self.leases_key], args=[now, now + lease, worker_id])
+        if leased is None:
+            return None
+        data = json.loads(leased)
+        return WorkItem(data["job_id"], data["url"], data["attempts"], leased)
+
+    def complete(self, item, record):
+        self._finish(keys=[self.leases_key, self.pending_key, self._job_key(item.job_id, "results")],
+                     args=[item.token, "", json.dumps(record, ensure_ascii=False)])
+
+    def fail(self, item, record, retry=False):
+        """Give the URL back for another attempt, or store `record` (an error row) as its result"""
+        if retry:
+            data = json.loads(item.token)
+            requeued = json.dumps({"job_id": data["job_id"], "url": data["url"], "attempts": data["attempts"]})
+            self._finish(keys=[self.leases_key, self.pending_key, self._job_key(item.job_id, "results")],
+                         args=[item.token, requeued, ""])
+        else:
+            self.complete(item, record)
+
+    def results(self, job_id, cursor=0):
+        records = self.client.lrange(self._job_key(job_id, "results"), cursor, -1)
+        return [json.loads(record) for record in records], cursor + len(records)
+
+    def cancel(self, job_id):
+        """Drop the job's URLs that no worker has claimed yet"""
+        for item in self.client.lrange(self.pending_key, 0, -1):
+            if json.loads(item)["job_id"] == job_id:
+                self.client.lrem(self.pending_key, 0, item)
+
+    def purge(self, job_id):
+        """Forget the job: its URLs, claimed or not, and its results. A worker still holding one is ignored"""
+        self.cancel(job_id)
+        for item in self.client.zrange(self.leases_key, 0, -1):
+            if json.loads(item)["job_id"] == job_id:
+                # REDIS_FINISH drops the result of a lease that is gone
+                self.client.zrem(self.leases_key, item)
+        self.client.delete(self._job_key(job_id, "urls"), self._job_key(job_id, "results"))
+
+    def close(self):
+        self.client.close()
+
+
+def open_work_queue(url=None):
+    """Open the queue at `url` (default WORK_QUEUE_URL): redis://... or a SQLite file path"""
+    url = url or get_config().work_queue_url
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisWorkQueue(url)
+    if url.startswith("sqlite:///"):
+        url = url[len("sqlite:///"):]
+    return SqliteWorkQueue(url)